@@ -0,0 +1,17 @@
+# -*- coding: utf-8 -*-
+'''
+Benchmarks for the filters and tags
+
+Each filter and tag is rendered through real Template/Context objects at
+several input sizes. Run them with::
+
+    python manage.py benchmark_templatetags --save baseline.json
+    python manage.py benchmark_templatetags --compare baseline.json
+
+Add --memory to measure peak memory and retained blocks instead of time,
+or --threads to measure the cache throughput with 1, 2, 4 and 8 threads.
+'''
+from .cases import CASES, SIZES
+from .runner import compare, load_baseline, run, save_baseline
+from .memory import measure_memory, run_memory
+from .threads import measure_cache_throughput, run_threads
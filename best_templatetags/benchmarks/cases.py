@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+'''
+Benchmark cases : one or more per filter and tag
+'''
+import datetime
+from collections import namedtuple
+from decimal import Decimal
+
+Case = namedtuple('Case', 'name library kind template make_context')
+
+# input sizes per kind : characters for strings, items for lists
+SIZES = {
+    'str': (16, 1024, 64 * 1024, 1024 * 1024),
+    'html': (16, 1024, 64 * 1024, 1024 * 1024),
+    'list': (10, 1000, 100000, 1000000),
+}
+
+
+def make_str(size):
+    path = '/home/theuser/projects/'
+    return (path * (size // len(path) + 1))[:size]
+
+
+def make_html(size):
+    chunk = ('<p class="c">Some <b>bold</b> <a href="x" id="y">link</a>'
+             '<!-- comment --><script>alert(1)</script></p>\n')
+    return (chunk * (size // len(chunk) + 1))[:size]
+
+
+def make_list(size):
+    return [(i * 7919) % size for i in range(size)]
+
+
+def make_pairs(size):
+    return [(str(i), (i * 7919) % size) for i in range(size)]
+
+
+def make_decimals(size):
+    return [Decimal(i % 1000) / 100 for i in range(size)]
+
+
+def make_dates(size):
+    start = datetime.date(1950, 1, 1)
+    return [start + datetime.timedelta(days=i % 20000) for i in range(size)]
+
+
+def make_urls(size):
+    return ['http://a.com/b/c.html?d=%d&e=2#top' % i for i in range(size)]
+
+
+def value(factory):
+    return lambda size: {'value': factory(size)}
+
+
+def values(factory):
+    return lambda size: {'values': factory(size)}
+
+
+def loop(expr):
+    return '{%% for v in values %%}%s{%% endfor %%}' % expr
+
+
+CASES = [
+    # best_filters
+    Case('type', 'best_filters', 'list', loop('{{ v|type }}'),
+         values(make_list)),
+    Case('basename', 'best_filters', 'str', '{{ value|basename }}',
+         value(make_str)),
+    Case('dirname', 'best_filters', 'str', '{{ value|dirname }}',
+         value(make_str)),
+    Case('multiply', 'best_filters', 'list', loop('{{ v|multiply:3 }}'),
+         values(make_list)),
+    Case('multiply_str', 'best_filters', 'str', '{{ value|multiply:3 }}',
+         value(make_str)),
+    Case('divide', 'best_filters', 'list', loop('{{ v|divide:3 }}'),
+         values(make_decimals)),
+    Case('listmultiply', 'best_filters', 'list',
+         '{{ values|listmultiply:3|length }}', values(make_decimals)),
+    Case('listdivide', 'best_filters', 'list',
+         '{{ values|listdivide:3|length }}', values(make_decimals)),
+    Case('listsum', 'best_filters', 'list', '{{ values|listsum }}',
+         values(make_decimals)),
+    Case('listmean', 'best_filters', 'list', '{{ values|listmean }}',
+         values(make_decimals)),
+    Case('listpercent', 'best_filters', 'list',
+         '{{ values|listpercent:2|length }}', values(make_list)),
+    Case('replace', 'best_filters', 'str',
+         '{{ value|replace:"/theuser/other" }}', value(make_str)),
+    Case('resub', 'best_filters', 'str',
+         '{{ value|resub:",/home/([^/]*)/,/Users/\\1/" }}', value(make_str)),
+    Case('age', 'best_filters', 'list', loop('{{ v|age }}'),
+         values(make_dates)),
+    Case('truncat', 'best_filters', 'str', '{{ value|truncat:"proj" }}',
+         value(make_str)),
+    Case('sanitizetags', 'best_filters', 'html', '{{ value|sanitizetags }}',
+         value(make_html)),
+    Case('get_key', 'best_filters', 'list',
+         loop('{{ mapping|get_key:v }}'),
+         lambda size: {'values': [str(i) for i in range(size)],
+                       'mapping': dict((str(i), i) for i in range(size))}),
+    Case('listsort', 'best_filters', 'list',
+         '{{ values|listsort|length }}', values(make_list)),
+    Case('listsort_col', 'best_filters', 'list',
+         '{{ values|listsort:1|length }}', values(make_pairs)),
+    Case('listsortreversed', 'best_filters', 'list',
+         '{% for v in values|listsortreversed %}{% endfor %}',
+         values(make_list)),
+    Case('batch', 'best_filters', 'list',
+         '{% for row in values|listsort|batch:"4,0" %}{% endfor %}',
+         values(make_list)),
+    # best_html
+    Case('best_html.sanitizetags', 'best_html', 'html',
+         '{{ value|sanitizetags:"a:href b p" }}', value(make_html)),
+    # best_tags
+    Case('update_url', 'best_tags', 'list',
+         loop('{% update_url v without="e" d=3 anchor_hash="x" %}'),
+         values(make_urls)),
+    Case('extend_url', 'best_tags', 'list',
+         loop('{% extend_url v without="e" d=3 %}'), values(make_urls)),
+    Case('hash', 'best_tags', 'str', '{% hash "md5" value %}',
+         value(make_str)),
+    Case('render_template', 'best_tags', 'list',
+         loop('{% render_template snippet %}'),
+         lambda size: {'values': range(size),
+                       'snippet': '<b>{{ v|upper }}</b>'}),
+    Case('profile', 'best_tags', 'list',
+         '{% profile "bench" %}' + loop('{{ v }}') + '{{ values|length }}'
+         '{% endprofile %}', values(make_list)),
+    Case('minify', 'best_tags', 'html',
+         '{% minify %}{{ value|safe }}{% endminify %}', value(make_html)),
+    Case('inspect_context', 'best_tags', 'list', '{% inspect_context %}',
+         values(make_list)),
+]
@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+'''
+Measure peak and retained memory of the benchmark cases with tracemalloc
+'''
+import tracemalloc
+
+from django.template import Context, Template
+
+from .cases import CASES, SIZES
+
+
+def measure_memory(case, size):
+    """Render a case once under tracemalloc
+
+    It gives the peak of memory allocated during the render in bytes, and the
+    number of memory blocks the render allocated that are still alive once
+    its output is released (caches, leaks...). Inputs are built before
+    tracing starts.
+    """
+    template = Template('{%% load %s %%}%s' % (case.library, case.template))
+    context = Context(case.make_context(size))
+    template.render(context)  # warm-up : lazy imports, caches...
+    tracemalloc.start()
+    try:
+        output = template.render(context)
+        peak = tracemalloc.get_traced_memory()[1]
+        del output
+        snapshot = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    retained = sum(stat.count for stat in snapshot.statistics('filename'))
+    return {'peak': peak, 'retained_blocks': retained}
+
+
+def run_memory(cases=None, max_size=None, callback=None):
+    """Same as :func:`best_templatetags.benchmarks.run` for memory usage"""
+    results = {}
+    for case in cases if cases is not None else CASES:
+        for size in SIZES[case.kind]:
+            if max_size is not None and size > max_size:
+                continue
+            key = '%s[%d]' % (case.name, size)
+            results[key] = measure_memory(case, size)
+            if callback:
+                callback(key, results[key])
+    return {'meta': {'measure': 'memory'}, 'results': results}
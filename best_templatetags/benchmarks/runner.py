@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+'''
+Run the benchmark cases and compare them with a JSON baseline
+'''
+import json
+import platform
+import statistics
+import time
+
+import django
+from django.template import Context, Template
+
+from .cases import CASES, SIZES
+
+
+def select_cases(names=None):
+    """Give the cases whose name contains one of the given names"""
+    if not names:
+        return list(CASES)
+    return [c for c in CASES if any(n in c.name for n in names)]
+
+
+def measure(case, size, repeat=5, min_time=0.05):
+    """Render a case at a given size and give timings in seconds per render
+
+    The render is run in loops lasting at least min_time, loops are repeated
+    'repeat' times : the best and the median loops are kept.
+    """
+    template = Template('{%% load %s %%}%s' % (case.library, case.template))
+    context = Context(case.make_context(size))
+    template.render(context)  # warm-up
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            template.render(context)
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        number *= 2
+    timings = [elapsed / number]
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            template.render(context)
+        timings.append((time.perf_counter() - start) / number)
+    return {'min': min(timings), 'median': statistics.median(timings)}
+
+
+def run(cases=None, max_size=None, repeat=5, min_time=0.05, callback=None):
+    """Run benchmark cases for all their sizes up to max_size
+
+    Results are a dict with 'meta' and 'results' keys, results are keyed by
+    '<case name>[<size>]'. callback(key, timings) is called after each run.
+    """
+    results = {}
+    for case in cases if cases is not None else CASES:
+        for size in SIZES[case.kind]:
+            if max_size is not None and size > max_size:
+                continue
+            key = '%s[%d]' % (case.name, size)
+            results[key] = measure(case, size, repeat, min_time)
+            if callback:
+                callback(key, results[key])
+    return {
+        'meta': {
+            'python': platform.python_version(),
+            'django': django.get_version(),
+        },
+        'results': results,
+    }
+
+
+def save_baseline(path, data):
+    with open(path, 'w') as fh:
+        json.dump(data, fh, indent=2, sort_keys=True)
+
+
+def load_baseline(path):
+    with open(path) as fh:
+        return json.load(fh)
+
+
+def compare(data, baseline, tolerance=0.2, metric='min', slack=0):
+    """Give the runs slower than the baseline by more than tolerance
+
+    It returns a list of (key, baseline value, current value) ; runs that are
+    not in the baseline are ignored. Use metric='peak' or
+    metric='retained_blocks' to compare memory results. slack is an absolute
+    increase always allowed on top of tolerance, for small counts like
+    retained blocks where one more block is not a regression.
+    """
+    regressions = []
+    for key, values in sorted(data['results'].items()):
+        ref = baseline['results'].get(key)
+        if ref is None or metric not in ref:
+            continue
+        if values[metric] > ref[metric] * (1 + tolerance) + slack:
+            regressions.append((key, ref[metric], values[metric]))
+    return regressions
@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+'''
+Measure the throughput of the shared LRU caches under concurrent renders
+'''
+import threading
+import time
+
+from ..cache import LRUCache
+
+THREADS = (1, 2, 4, 8)
+
+
+def measure_cache_throughput(threads, duration=0.5, keys=500, maxsize=256):
+    """Give the number of get_or_set() calls per second done by threads
+
+    Every thread reads and fills the same LRUCache, with more keys than the
+    cache can hold so that entries are evicted too.
+    """
+    cache = LRUCache(maxsize=maxsize)
+    counts = [0] * threads
+    stop = time.perf_counter() + duration
+
+    def worker(n):
+        i = 0
+        while time.perf_counter() < stop:
+            for _ in range(100):
+                key = (n * 7919 + i) % keys
+                cache.get_or_set(key, lambda: key * 2)
+                i += 1
+        counts[n] = i
+    workers = [threading.Thread(target=worker, args=(n,))
+               for n in range(threads)]
+    start = time.perf_counter()
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    return sum(counts) / (time.perf_counter() - start)
+
+
+def run_threads(threads=THREADS, duration=0.5, callback=None):
+    """Measure the cache throughput for each number of threads"""
+    results = {}
+    for count in threads:
+        key = 'LRUCache[%d threads]' % count
+        results[key] = {'ops': measure_cache_throughput(count, duration)}
+        if callback:
+            callback(key, results[key])
+    return {'meta': {'measure': 'threads'}, 'results': results}
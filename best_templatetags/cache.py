@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+'''
+Thread-safe memoization caches shared by the filters and tags
+
+Renders running in many threads must not wait behind one global lock : a
+cache is split in shards, each one being a small LRU dict with its own lock,
+and a key always goes to the same shard. Values are computed outside of the
+locks, so a slow computation never blocks other threads.
+
+All caches are cleared when a setting is changed (setting_changed signal),
+or by calling clear_all().
+
+@author: Eric Lapouyade
+'''
+import threading
+import weakref
+from collections import OrderedDict
+
+from django.core.signals import setting_changed
+
+_caches = weakref.WeakSet()
+
+
+class LRUCache(object):
+    """Bounded LRU cache with sharded locks
+
+    maxsize is the total number of entries, shared equally by the shards.
+    """
+    def __init__(self, maxsize=1024, shards=16):
+        self.shards = [(OrderedDict(), threading.Lock())
+                       for _ in range(shards)]
+        self.shard_size = max(1, -(-maxsize // shards))
+        _caches.add(self)
+
+    def shard(self, key):
+        return self.shards[hash(key) % len(self.shards)]
+
+    def get(self, key, default=None):
+        entries, lock = self.shard(key)
+        with lock:
+            try:
+                entries.move_to_end(key)
+            except KeyError:
+                return default
+            return entries[key]
+
+    def set(self, key, value):
+        entries, lock = self.shard(key)
+        with lock:
+            entries[key] = value
+            entries.move_to_end(key)
+            if len(entries) > self.shard_size:
+                entries.popitem(last=False)
+
+    def get_or_set(self, key, factory):
+        """Give the cached value, or cache and give factory()
+
+        factory is called without holding any lock : two threads may compute
+        the same value, one of them is kept.
+        """
+        missing = _missing
+        value = self.get(key, missing)
+        if value is missing:
+            value = factory()
+            self.set(key, value)
+        return value
+
+    def clear(self):
+        for entries, lock in self.shards:
+            with lock:
+                entries.clear()
+
+    def __len__(self):
+        return sum(len(entries) for entries, lock in self.shards)
+
+
+_missing = object()
+
+
+def clear_all(**kwargs):
+    """Clear all the caches"""
+    for cache in list(_caches):
+        cache.clear()
+
+
+setting_changed.connect(clear_all, dispatch_uid='best_templatetags.cache')
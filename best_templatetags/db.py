@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+'''
+Database side counterparts of some filters
+
+@author: Eric Lapouyade
+'''
+from django.db.models import (Case, ExpressionWrapper, IntegerField, Q,
+                              Value, When)
+from django.db.models.functions import ExtractYear
+
+from .utils import today
+
+
+class Age(ExpressionWrapper):
+    """SQL expression giving the age in year of a date field
+
+    It has the same semantics as the 'age' filter : the age is incremented on
+    the birthday, a 29th of February birthday is reached on the 1st of March
+    on non-leap years. If ref_date is not given, the reference day is today.
+
+    Example::
+
+        User.objects.annotate(age=Age('birthdate')).filter(age__gte=18)
+    """
+    def __init__(self, field, ref_date=None):
+        if ref_date is None:
+            ref_date = today()
+        not_yet = (Q(**{field + '__month__gt': ref_date.month}) |
+                   Q(**{field + '__month': ref_date.month,
+                        field + '__day__gt': ref_date.day}))
+        expression = (
+            Value(ref_date.year) - ExtractYear(field) -
+            Case(When(not_yet, then=Value(1)), default=Value(0))
+        )
+        super().__init__(expression, output_field=IntegerField())
+
+
+def annotate_age(queryset, field, name='age', ref_date=None):
+    """Annotate a queryset with the age in year of a date field
+
+    Templates can then read the precomputed attribute instead of using the
+    'age' filter on each row, and the queryset can be ordered or filtered
+    on that age by the database.
+
+    Example::
+
+        users = annotate_age(User.objects.all(), 'birthdate').order_by('age')
+    """
+    return queryset.annotate(**{name: Age(field, ref_date)})
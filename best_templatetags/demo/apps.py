@@ -0,0 +1,7 @@
+from django.apps import AppConfig
+
+
+class DemoConfig(AppConfig):
+    name = 'best_templatetags.demo'
+    label = 'demo'
+    default_auto_field = 'django.db.models.AutoField'
@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+'''
+Load test the demo views with concurrent threads
+
+Requests are either sent in-process to the WSGI application of the project,
+or to a running server (for example 'python manage.py runserver' or
+gunicorn) when a server URL is given.
+'''
+import statistics
+import threading
+import time
+from io import BytesIO
+from urllib.parse import urlsplit
+from urllib.request import urlopen
+from wsgiref.util import setup_testing_defaults
+
+from django.core.wsgi import get_wsgi_application
+
+DEFAULT_PATHS = ('/demo/comments/', '/demo/table/?page=3&sort=name',
+                 '/demo/snippets/')
+
+
+def wsgi_client(application):
+    """Give a function sending a GET request to a WSGI application"""
+    def get(path):
+        parts = urlsplit(path)
+        environ = {'PATH_INFO': parts.path, 'QUERY_STRING': parts.query,
+                   'REQUEST_METHOD': 'GET', 'wsgi.input': BytesIO()}
+        setup_testing_defaults(environ)
+        status = []
+
+        def start_response(status_line, headers, exc_info=None):
+            status.append(int(status_line.split()[0]))
+        result = application(environ, start_response)
+        try:
+            for _ in result:
+                pass
+        finally:
+            if hasattr(result, 'close'):
+                result.close()
+        return status[0]
+    return get
+
+
+def http_client(server):
+    """Give a function sending a GET request to a running server"""
+    def get(path):
+        with urlopen(server.rstrip('/') + path) as response:
+            response.read()
+            return response.status
+    return get
+
+
+def percentile(sorted_values, percent):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1,
+                int(round(percent / 100.0 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def summary(latencies, errors, duration):
+    latencies = sorted(latencies)
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'rps': len(latencies) / duration if duration else 0.0,
+        'mean': statistics.mean(latencies) if latencies else 0.0,
+        'p50': percentile(latencies, 50),
+        'p90': percentile(latencies, 90),
+        'p99': percentile(latencies, 99),
+    }
+
+
+def hammer(get, path, threads, requests):
+    """Send 'requests' GET requests to path with 'threads' threads
+
+    It gives the list of latencies, the number of errors and the duration.
+    """
+    latencies = []
+    errors = [0]
+    remaining = [requests]
+    lock = threading.Lock()
+
+    def worker():
+        while True:
+            with lock:
+                if remaining[0] <= 0:
+                    return
+                remaining[0] -= 1
+            start = time.perf_counter()
+            try:
+                ok = get(path) < 400
+            except Exception:
+                ok = False
+            elapsed = time.perf_counter() - start
+            with lock:
+                latencies.append(elapsed)
+                if not ok:
+                    errors[0] += 1
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    start = time.perf_counter()
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    return latencies, errors[0], time.perf_counter() - start
+
+
+def run(paths=DEFAULT_PATHS, threads=4, requests=200, server=None,
+        warmup=True, callback=None):
+    """Load test each path in turn with 'requests' GET requests
+
+    It gives a dict with an entry per path and an 'all' entry, each with the
+    number of requests and errors, the requests per second and the latencies
+    (mean, p50, p90, p99) in seconds. callback(path, result) is called after
+    each path.
+    """
+    get = http_client(server) if server else wsgi_client(
+        get_wsgi_application())
+    results = {}
+    all_latencies = []
+    all_errors = 0
+    all_duration = 0.0
+    for path in paths:
+        if warmup:
+            get(path)
+        latencies, errors, duration = hammer(get, path, threads, requests)
+        results[path] = summary(latencies, errors, duration)
+        all_latencies.extend(latencies)
+        all_errors += errors
+        all_duration += duration
+        if callback:
+            callback(path, results[path])
+    results['all'] = summary(all_latencies, all_errors, all_duration)
+    return results
@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+import json
+
+from django.core.management.base import BaseCommand
+
+from best_templatetags.demo import loadtest
+
+
+class Command(BaseCommand):
+    help = ('Load test the demo views with concurrent threads, in-process or '
+            'against a running server, and report requests per second and '
+            'latency percentiles')
+
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='*',
+                            help='paths to request (default: %s)'
+                                 % ' '.join(loadtest.DEFAULT_PATHS))
+        parser.add_argument('--threads', type=int, default=4)
+        parser.add_argument('--requests', type=int, default=200,
+                            help='number of requests per path')
+        parser.add_argument('--server', metavar='URL',
+                            help='send requests to this server, for example '
+                                 'http://127.0.0.1:8000, instead of '
+                                 'in-process')
+        parser.add_argument('--json', action='store_true',
+                            help='output the results as JSON')
+
+    def line(self, name, r):
+        return '%-36s %6d %6d %9.1f %9.2f %9.2f %9.2f %9.2f' % (
+            name, r['requests'], r['errors'], r['rps'], r['mean'] * 1e3,
+            r['p50'] * 1e3, r['p90'] * 1e3, r['p99'] * 1e3)
+
+    def handle(self, *args, **options):
+        if not options['json']:
+            self.stdout.write('%-36s %6s %6s %9s %9s %9s %9s %9s' % (
+                'path', 'reqs', 'errors', 'req/s', 'mean ms', 'p50 ms',
+                'p90 ms', 'p99 ms'))
+
+        def report(path, result):
+            if not options['json']:
+                self.stdout.write(self.line(path, result))
+        results = loadtest.run(options['paths'] or loadtest.DEFAULT_PATHS,
+                               options['threads'], options['requests'],
+                               options['server'], callback=report)
+        if options['json']:
+            self.stdout.write(json.dumps(results, indent=2))
+        else:
+            self.stdout.write(self.line('all', results['all']))
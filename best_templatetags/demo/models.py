@@ -0,0 +1,14 @@
+# -*- coding: utf-8 -*-
+from django.db import models
+
+
+class Snippet(models.Model):
+    """A template snippet stored in the database for {% render_template %}"""
+    name = models.CharField(max_length=64, unique=True)
+    source = models.TextField()
+
+    class Meta:
+        ordering = ('name',)
+
+    def __str__(self):
+        return self.name
@@ -0,0 +1,11 @@
+from django.urls import path
+
+from . import views
+
+app_name = 'demo'
+
+urlpatterns = [
+    path('comments/', views.comments, name='comments'),
+    path('table/', views.table, name='table'),
+    path('snippets/', views.snippets, name='snippets'),
+]
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+'''
+Demo views rendering realistic heavy templates, used by the loadtest command
+'''
+import datetime
+import random
+
+from django.core.paginator import Paginator
+from django.shortcuts import render
+
+from .models import Snippet
+
+COMMENT_BODIES = (
+    '<p>Great <b>article</b>, thanks !</p>',
+    '<p>See <a href="http://example.com" onclick="spam()">this</a></p>'
+    '<script>alert("xss")</script>',
+    '<div><i>Nested <b>tags <u>everywhere</u></b></i></div>'
+    '<!-- hidden comment -->',
+    '<p>Click <a href="javascript:hack_me();">here</a> for <img '
+    'src="x.png" onerror="boom()"> a prize</p>',
+)
+
+DEFAULT_SNIPPETS = {
+    'header': '<h1>{{ title|upper }}</h1>',
+    'price': '{% load best_filters %}<span>{{ price|multiply:qty }}</span>',
+    'breadcrumb': '{% for part in path %}<a href="/{{ part }}">'
+                  '{{ part|title }}</a>{% if not forloop.last %} / '
+                  '{% endif %}{% endfor %}',
+    'user': '{% load best_filters %}<p>{{ name }}, '
+            '{{ birthdate|age:today }} years old</p>',
+}
+
+
+def make_comments(count):
+    rand = random.Random(count)
+    return [{'author': 'user%d' % i,
+             'body': rand.choice(COMMENT_BODIES) * rand.randint(1, 5)}
+            for i in range(count)]
+
+
+def comments(request):
+    """A list of user comments sanitized with sanitizetags"""
+    count = int(request.GET.get('n', 200))
+    return render(request, 'demo/comments.html',
+                  {'comments': make_comments(count)})
+
+
+def table(request):
+    """A sortable, paginated table with links built with update_url"""
+    rows = [{'id': i, 'name': 'item %05d' % ((i * 7919) % 10000),
+             'price': (i * 37) % 1000 / 10.0} for i in range(10000)]
+    sort = request.GET.get('sort', 'id')
+    if sort not in ('id', 'name', 'price'):
+        sort = 'id'
+    rows.sort(key=lambda row: row[sort])
+    paginator = Paginator(rows, int(request.GET.get('per_page', 50)))
+    page = paginator.get_page(request.GET.get('page'))
+    return render(request, 'demo/table.html', {
+        'page_obj': page,
+        'page_range': paginator.get_elided_page_range(page.number)
+        if hasattr(paginator, 'get_elided_page_range')
+        else paginator.page_range,
+        'columns': ('id', 'name', 'price'),
+    })
+
+
+def snippets(request):
+    """Template snippets stored in the database rendered with
+    render_template"""
+    if not Snippet.objects.exists():
+        Snippet.objects.bulk_create(
+            Snippet(name=name, source=source)
+            for name, source in DEFAULT_SNIPPETS.items())
+    return render(request, 'demo/snippets.html', {
+        'snippets': list(Snippet.objects.all()) * 25,
+        'title': 'Snippets', 'price': 12, 'qty': 3,
+        'path': ('home', 'products', 'shoes'), 'name': 'Eric',
+        'birthdate': datetime.date(1980, 5, 17),
+        'today': datetime.date(2020, 5, 6),
+    })
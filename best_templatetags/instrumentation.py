@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+'''
+Opt-in timing and call count instrumentation of the filters and tags
+
+Set BEST_TEMPLATETAGS_INSTRUMENT = True in settings to enable it : the
+filters and tags are then wrapped when their library is loaded. When the
+setting is off, nothing is wrapped and there is no overhead at all.
+
+Set BEST_TEMPLATETAGS_INSTRUMENT_LOG = True to also emit one DEBUG record per
+call on the 'best_templatetags.instrumentation' logger.
+
+@author: Eric Lapouyade
+'''
+import functools
+import logging
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# number of latest durations kept per filter/tag to compute the p99
+SAMPLES = 1000
+
+_stats = {}
+_lock = threading.Lock()
+
+
+class CallStats(object):
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.samples = deque(maxlen=SAMPLES)
+        self.total_size = 0
+        self.max_size = 0
+
+    def add(self, duration, size):
+        self.count += 1
+        self.total += duration
+        self.samples.append(duration)
+        if size is not None:
+            self.total_size += size
+            if size > self.max_size:
+                self.max_size = size
+
+    def as_dict(self):
+        samples = sorted(self.samples)
+        return {
+            'count': self.count,
+            'total': self.total,
+            'mean': self.total / self.count if self.count else 0.0,
+            'p99': samples[int(len(samples) * 0.99)] if samples else 0.0,
+            'mean_size': self.total_size / self.count if self.count else 0,
+            'max_size': self.max_size,
+        }
+
+
+def record(name, duration, size=None):
+    """Record one call of a filter or a tag"""
+    with _lock:
+        stats = _stats.get(name)
+        if stats is None:
+            stats = _stats[name] = CallStats()
+        stats.add(duration, size)
+    if getattr(settings, 'BEST_TEMPLATETAGS_INSTRUMENT_LOG', False):
+        logger.debug('%s took %.1f us (size: %s)', name, duration * 1e6, size,
+                     extra={'templatetag': name, 'duration': duration,
+                            'size': size})
+
+
+def get_stats():
+    """Give a dict {'<library>.<name>': stats dict} sorted by total time"""
+    with _lock:
+        stats = [(name, s.as_dict()) for name, s in _stats.items()]
+    stats.sort(key=lambda item: item[1]['total'], reverse=True)
+    return dict(stats)
+
+
+def reset_stats():
+    with _lock:
+        _stats.clear()
+
+
+def size_of(value):
+    """Give the size of a value without evaluating QuerySets"""
+    if getattr(value, '_result_cache', False) is None:
+        return None
+    try:
+        return len(value)
+    except TypeError:
+        return None
+
+
+def instrument_filter(name, func):
+    @functools.wraps(func)
+    def wrapper(value, *args):
+        start = time.perf_counter()
+        try:
+            return func(value, *args)
+        finally:
+            record(name, time.perf_counter() - start, size_of(value))
+    wrapper._instrumented = True
+    return wrapper
+
+
+class TimedRender(object):
+    """Replacement of a node render() method recording its timing
+
+    It is a module level class rather than a closure so that instrumented
+    nodes can still be pickled by the render_template disk cache.
+    """
+    def __init__(self, name, node):
+        self.name = name
+        self.node = node
+
+    def __call__(self, context):
+        start = time.perf_counter()
+        output = ''
+        try:
+            output = type(self.node).render(self.node, context)
+            return output
+        finally:
+            record(self.name, time.perf_counter() - start, size_of(output))
+
+
+def instrument_tag(name, compile_func):
+    @functools.wraps(compile_func)
+    def wrapper(parser, token):
+        node = compile_func(parser, token)
+        node.render = TimedRender(name, node)
+        return node
+    wrapper._instrumented = True
+    return wrapper
+
+
+def instrument(register, library_name, force=False):
+    """Wrap the filters and tags of a template library to record their stats
+
+    It does nothing unless BEST_TEMPLATETAGS_INSTRUMENT is set or force is
+    True, so libraries can still be imported before settings are configured.
+    Already instrumented entries are left as is.
+    """
+    if not force and not (settings.configured and getattr(
+            settings, 'BEST_TEMPLATETAGS_INSTRUMENT', False)):
+        return register
+    for name, func in list(register.filters.items()):
+        if not getattr(func, '_instrumented', False):
+            register.filters[name] = instrument_filter(
+                '%s.%s' % (library_name, name), func)
+    for name, func in list(register.tags.items()):
+        if not getattr(func, '_instrumented', False):
+            register.tags[name] = instrument_tag(
+                '%s.%s' % (library_name, name), func)
+    return register
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+'''
+Jinja2 support : the same filters and tags for Django's Jinja2 backend
+
+Filters are taken from the best_filters and best_html libraries, and tags
+are exposed as global functions, so both engines share one implementation.
+In settings.py ::
+
+    TEMPLATES = [
+        {
+            'BACKEND': 'django.template.backends.jinja2.Jinja2',
+            'OPTIONS': {
+                'environment': 'best_templatetags.jinja2.environment',
+            },
+        },
+    ]
+
+Or add 'best_templatetags.jinja2.BestTemplatetagsExtension' to the
+'extensions' option of an existing environment. Then in templates ::
+
+    {{ mypath|basename }} {{ comment|sanitizetags("b i") }}
+    {{ update_url(myurl, without="d", f=4) }}
+    {{ render_template(mytemplate) }}
+
+Jinja2 builtin filters are never overridden : the filters having the same
+name as an existing one ('batch' and 'replace') are registered with a 'best_'
+prefix instead ::
+
+    {{ mylist|best_batch(3) }} {{ mystr|best_replace("/a/b/") }}
+
+@author: Eric Lapouyade
+'''
+from jinja2 import Environment
+from jinja2.ext import Extension
+from markupsafe import Markup
+
+try:
+    from jinja2 import pass_context
+except ImportError:  # Jinja2 < 3.0
+    from jinja2 import contextfunction as pass_context
+
+from .templatetags import best_filters, best_html, best_tags
+
+# prefix of the filters and globals whose name is already used in Jinja2
+PREFIX = 'best_'
+
+
+@pass_context
+def render_template(context, value, by_name=False):
+    """Render a string as it was a Jinja2 template with the current context
+
+    If the value starts with 'name:' or by_name is True, the value is a
+    template name, loaded by the environment.
+    """
+    if by_name or value.startswith('name:'):
+        if not by_name:
+            value = value[len('name:'):]
+        template = context.environment.get_template(value)
+    else:
+        template = context.environment.from_string(value)
+    return Markup(template.render(context.get_all()))
+
+
+def get_filters():
+    """Give the filters of best_filters and best_html libraries"""
+    filters = dict(best_filters.register.filters)
+    filters.update(best_html.register.filters)
+    return filters
+
+
+def get_globals():
+    """Give the tags of best_tags library as global functions"""
+    return {
+        'update_url': best_tags.update_url,
+        'extend_url': best_tags.extend_url,
+        'hash': best_tags.hash,
+        'render_template': render_template,
+    }
+
+
+class BestTemplatetagsExtension(Extension):
+    def __init__(self, environment):
+        super().__init__(environment)
+        for registry, items in ((environment.filters, get_filters()),
+                                (environment.globals, get_globals())):
+            for name, func in items.items():
+                if name in registry:
+                    name = PREFIX + name
+                registry[name] = func
+
+
+def environment(**options):
+    """Jinja2 environment factory with best_templatetags filters and tags"""
+    env = Environment(**options)
+    env.add_extension(BestTemplatetagsExtension)
+    return env
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+from django.core.management.base import BaseCommand, CommandError
+
+from best_templatetags import benchmarks
+
+# retained blocks are a few units : allow some more before failing
+RETAINED_BLOCKS_SLACK = 10
+
+
+class Command(BaseCommand):
+    help = ('Benchmark every filter and tag at several input sizes, '
+            'save or compare the results with a JSON baseline')
+
+    def add_arguments(self, parser):
+        parser.add_argument('cases', nargs='*',
+                            help='run only cases whose name contains these')
+        parser.add_argument('--save', metavar='FILE',
+                            help='save the results as a JSON baseline')
+        parser.add_argument('--compare', metavar='FILE',
+                            help='fail when worse than this JSON baseline')
+        parser.add_argument('--tolerance', type=float, default=0.2,
+                            help='allowed increase ratio (default: 0.2)')
+        parser.add_argument('--max-size', type=int, default=None,
+                            help='skip input sizes above this one')
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--memory', action='store_true',
+                            help='measure peak memory and retained blocks '
+                                 'with tracemalloc instead of time')
+        parser.add_argument('--threads', action='store_true',
+                            help='only report the cache throughput with '
+                                 '1, 2, 4 and 8 threads')
+
+    def handle(self, *args, **options):
+        if options['threads']:
+            def report(key, values):
+                self.stdout.write('%-40s %12d ops/s' % (key, values['ops']))
+
+            self.stdout.write('%-40s %18s' % ('case', 'throughput'))
+            benchmarks.run_threads(callback=report)
+            return
+
+        cases = benchmarks.runner.select_cases(options['cases'])
+        if not cases:
+            raise CommandError('No benchmark case matches %s'
+                               % ', '.join(options['cases']))
+
+        if options['memory']:
+            def report(key, values):
+                self.stdout.write('%-40s %12d KB %15d' % (
+                    key, values['peak'] // 1024, values['retained_blocks']))
+
+            self.stdout.write('%-40s %15s %15s' % ('case', 'peak', 'retained'))
+            data = benchmarks.run_memory(cases, options['max_size'],
+                                         callback=report)
+            metrics = (('peak', 1 / 1024., 'KB', 0),
+                       ('retained_blocks', 1, 'blocks', RETAINED_BLOCKS_SLACK))
+        else:
+            def report(key, timings):
+                self.stdout.write('%-40s %12.3f us %12.3f us' % (
+                    key, timings['min'] * 1e6, timings['median'] * 1e6))
+
+            self.stdout.write('%-40s %15s %15s' % ('case', 'min', 'median'))
+            data = benchmarks.run(cases, options['max_size'],
+                                  options['repeat'], callback=report)
+            metrics = (('min', 1e6, 'us', 0),)
+        if options['save']:
+            benchmarks.save_baseline(options['save'], data)
+            self.stdout.write('Baseline saved in %s' % options['save'])
+        if options['compare']:
+            baseline = benchmarks.load_baseline(options['compare'])
+            regressions = []
+            for metric, scale, unit, slack in metrics:
+                for key, ref, current in benchmarks.compare(
+                        data, baseline, options['tolerance'], metric, slack):
+                    regressions.append(key)
+                    self.stderr.write('%s : %.3f %s -> %.3f %s (+%d%%)' % (
+                        key, ref * scale, unit, current * scale, unit,
+                        (current / ref - 1) * 100))
+            if regressions:
+                raise CommandError('%d benchmark(s) worse than baseline'
+                                   % len(regressions))
+            self.stdout.write('No regression against %s'
+                              % options['compare'])
@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+from django.core.management.base import BaseCommand, CommandError
+
+from best_templatetags import template_cache
+
+
+class Command(BaseCommand):
+    help = ('Pre-compile the render_template sources listed in '
+            'RENDER_TEMPLATE_PRECOMPILE into RENDER_TEMPLATE_CACHE_DIR')
+
+    def add_arguments(self, parser):
+        parser.add_argument('files', nargs='*',
+                            help='also pre-compile the content of these files')
+
+    def handle(self, *args, **options):
+        if template_cache.get_cache_dir() is None:
+            raise CommandError('RENDER_TEMPLATE_CACHE_DIR is not set')
+        sources = list(template_cache.get_precompile_sources())
+        for filename in options['files']:
+            with open(filename) as fh:
+                sources.append(fh.read())
+        done = 0
+        for source in sources:
+            try:
+                template_cache.save(source)
+                done += 1
+            except Exception as e:
+                self.stderr.write('Cannot pre-compile %r : %s'
+                                  % (source[:60], e))
+        self.stdout.write('%d template(s) pre-compiled in %s' % (
+            done, template_cache.get_cache_dir()))
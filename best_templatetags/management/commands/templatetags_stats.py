@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+import json
+from importlib import import_module
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.template.loader import get_template
+
+from best_templatetags import instrumentation
+
+LIBRARIES = ('best_filters', 'best_html', 'best_tags')
+
+
+class Command(BaseCommand):
+    help = ('Show call counts, latencies and input sizes of the filters and '
+            'tags, optionally after rendering some templates')
+
+    def add_arguments(self, parser):
+        parser.add_argument('templates', nargs='*',
+                            help='template names to render with an empty '
+                                 'context before showing the stats')
+        parser.add_argument('--repeat', type=int, default=1,
+                            help='number of renders per template')
+        parser.add_argument('--json', action='store_true',
+                            help='output the stats as JSON')
+
+    def handle(self, *args, **options):
+        if not getattr(settings, 'BEST_TEMPLATETAGS_INSTRUMENT', False):
+            # instrument the libraries for the templates rendered below
+            for library in LIBRARIES:
+                instrumentation.instrument(
+                    import_module('best_templatetags.templatetags.' +
+                                  library).register,
+                    library, force=True)
+        for name in options['templates']:
+            template = get_template(name)
+            for _ in range(options['repeat']):
+                template.render({})
+        stats = instrumentation.get_stats()
+        if options['json']:
+            self.stdout.write(json.dumps(stats, indent=2))
+            return
+        self.stdout.write('%-32s %8s %12s %12s %12s %10s' % (
+            'name', 'count', 'total ms', 'mean us', 'p99 us', 'mean size'))
+        for name, s in stats.items():
+            self.stdout.write('%-32s %8d %12.3f %12.1f %12.1f %10d' % (
+                name, s['count'], s['total'] * 1e3, s['mean'] * 1e6,
+                s['p99'] * 1e6, s['mean_size']))
@@ -0,0 +1,280 @@
+# -*- coding: utf-8 -*-
+'''
+Guard against catastrophic backtracking in regexes given to the filters
+
+Patterns of resub and truncat filters may come from admin-editable content.
+Patterns are analyzed when compiled : nested quantifiers like (a+)+ or
+(\\w+\\s?)* can take exponential time and are rejected, unless each
+repetition starts or ends with a char its inner quantifiers cannot match,
+like (?:-[a-z]+)*. Fixed counts like (\\d{3})+ are safe. The compiled pattern
+or the rejection is cached, so the guard costs nothing per call.
+
+Settings :
+
+    * BEST_TEMPLATETAGS_REGEX_POLICY : 'reject' (default) to reject unsafe
+      patterns, 'literal' to match all patterns as literal strings (resub
+      replacements are then literal too), 'allow' to compile patterns
+      without analysis.
+    * BEST_TEMPLATETAGS_REGEX_MAX_INPUT : if set, strings longer than this
+      are returned untouched by the filters.
+
+@author: Eric Lapouyade
+'''
+import logging
+import re
+
+from django.conf import settings
+
+from .cache import LRUCache
+
+try:
+    from re import _parser as sre_parse, _constants as sre_constants
+except ImportError:  # Python < 3.11
+    import sre_parse
+    import sre_constants
+
+logger = logging.getLogger(__name__)
+
+REPEATS = (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT)
+MAXREPEAT = sre_constants.MAXREPEAT
+
+_compiled = LRUCache(maxsize=512)
+
+
+class UnsafePatternError(ValueError):
+    pass
+
+
+def _children(op, av):
+    """Give the sub-patterns of a parsed regex item"""
+    if op in REPEATS:
+        return [av[2]]
+    if op == sre_constants.SUBPATTERN:
+        return [av[-1]]
+    if op == sre_constants.BRANCH:
+        return av[1]
+    if op in (sre_constants.ASSERT, sre_constants.ASSERT_NOT):
+        return [av[1]]
+    if op == sre_constants.GROUPREF_EXISTS:
+        return [sub for sub in av[1:] if sub]
+    # atomic groups and possessive repeats never backtrack
+    return []
+
+
+def _is_variable(op, av):
+    # a{3} always matches 3 chars : it cannot split its input in many ways
+    return op in REPEATS and av[0] != av[1]
+
+
+def _has_repeat(items):
+    for op, av in items:
+        if _is_variable(op, av) and av[1] > 1:
+            return True
+        if any(_has_repeat(sub) for sub in _children(op, av)):
+            return True
+    return False
+
+
+CATEGORIES = {
+    sre_constants.CATEGORY_DIGIT: re.compile(r'\d'),
+    sre_constants.CATEGORY_NOT_DIGIT: re.compile(r'\D'),
+    sre_constants.CATEGORY_SPACE: re.compile(r'\s'),
+    sre_constants.CATEGORY_NOT_SPACE: re.compile(r'\S'),
+    sre_constants.CATEGORY_WORD: re.compile(r'\w'),
+    sre_constants.CATEGORY_NOT_WORD: re.compile(r'\W'),
+}
+
+# chars tried when looking for a char matched by two char classes
+SAMPLE_CHARS = [chr(c) for c in range(0x300)]
+
+
+def _atom_matches(op, av, char):
+    """Tell whether a one char item may match char, None if unknown"""
+    code = ord(char)
+    if op == sre_constants.LITERAL:
+        return code == av
+    if op == sre_constants.NOT_LITERAL:
+        return code != av
+    if op == sre_constants.IN:
+        negate = False
+        for item_op, item_av in av:
+            if item_op == sre_constants.NEGATE:
+                negate = True
+            elif item_op == sre_constants.LITERAL:
+                found = code == item_av
+            elif item_op == sre_constants.RANGE:
+                found = item_av[0] <= code <= item_av[1]
+            elif item_op == sre_constants.CATEGORY \
+                    and item_av in CATEGORIES:
+                found = bool(CATEGORIES[item_av].match(char))
+            else:
+                return None
+            if item_op != sre_constants.NEGATE and found:
+                return not negate
+        return negate
+    return None
+
+
+def _atom_chars(op, av):
+    """Give the chars named by a one char item, to be tried too"""
+    if op in (sre_constants.LITERAL, sre_constants.NOT_LITERAL):
+        return [chr(av)]
+    if op == sre_constants.IN:
+        chars = []
+        for item_op, item_av in av:
+            if item_op == sre_constants.LITERAL:
+                chars.append(chr(item_av))
+            elif item_op == sre_constants.RANGE:
+                chars.extend((chr(item_av[0]), chr(item_av[1])))
+        return chars
+    return []
+
+
+def _atoms(items):
+    """Give the one char items a sub-pattern may consume, None if unknown"""
+    atoms = []
+    for op, av in items:
+        if op in (sre_constants.LITERAL, sre_constants.NOT_LITERAL,
+                  sre_constants.IN):
+            atoms.append((op, av))
+        elif op == sre_constants.AT:
+            pass  # anchors consume nothing
+        elif op in (sre_constants.ASSERT, sre_constants.ASSERT_NOT):
+            pass  # lookarounds consume nothing
+        elif op in REPEATS or op in (sre_constants.SUBPATTERN,
+                                     sre_constants.BRANCH):
+            for sub in _children(op, av):
+                sub_atoms = _atoms(sub)
+                if sub_atoms is None:
+                    return None
+                atoms.extend(sub_atoms)
+        else:  # any char, backreference...
+            return None
+    return atoms
+
+
+def _variable_atoms(items):
+    """Give the one char items variable repeats of items may consume"""
+    atoms = []
+    for op, av in items:
+        if _is_variable(op, av):
+            sub_atoms = _atoms(av[2])
+        else:
+            sub_atoms = []
+            for sub in _children(op, av):
+                found = _variable_atoms(sub)
+                if found is None:
+                    return None
+                sub_atoms.extend(found)
+        if sub_atoms is None:
+            return None
+        atoms.extend(sub_atoms)
+    return atoms
+
+
+def _disjoint(delimiter, atoms):
+    chars = SAMPLE_CHARS + _atom_chars(*delimiter)
+    for atom in atoms:
+        chars = chars + _atom_chars(*atom)
+    for char in chars:
+        if _atom_matches(*delimiter, char) is not False:
+            if any(_atom_matches(*atom, char) is not False for atom in atoms):
+                return False
+    return True
+
+
+def _is_delimited(items):
+    """Tell whether each repetition of items starts or ends with a char that
+    its variable repeats cannot match, like '-' in (?:-[a-z]+)*
+
+    The input is then split into repetitions in only one way.
+    """
+    items = list(items)
+    while len(items) == 1 and items[0][0] == sre_constants.SUBPATTERN:
+        items = list(items[0][1][-1])
+    atoms = _variable_atoms(items)
+    if not items or atoms is None:
+        return False
+    for op, av in (items[0], items[-1]):
+        if op in (sre_constants.LITERAL, sre_constants.NOT_LITERAL,
+                  sre_constants.IN) and _disjoint((op, av), atoms):
+            return True
+    return False
+
+
+def _find_nested_quantifier(items):
+    for op, av in items:
+        if (op in REPEATS and av[1] > 1 and _has_repeat(av[2])
+                and not _is_delimited(av[2])):
+            return True
+        if any(_find_nested_quantifier(sub) for sub in _children(op, av)):
+            return True
+    return False
+
+
+def analyze(pattern, flags=0):
+    r"""Give why a pattern may backtrack catastrophically, or None
+
+    Examples:
+
+        >>> from best_templatetags.saferegex import analyze
+        >>> analyze(r'/home/([^/]*)/projects') is None
+        True
+        >>> analyze(r'(\w+\s?)+$')
+        'nested quantifiers'
+        >>> analyze(r'(a+){1,40}$')
+        'nested quantifiers'
+        >>> analyze(r'[a-z]+(?:-[a-z]+)*') is None
+        True
+    """
+    if _find_nested_quantifier(sre_parse.parse(pattern, flags)):
+        return 'nested quantifiers'
+    return None
+
+
+def get_policy():
+    """Give the BEST_TEMPLATETAGS_REGEX_POLICY setting"""
+    return getattr(settings, 'BEST_TEMPLATETAGS_REGEX_POLICY', 'reject')
+
+
+def _compile(pattern, flags, suffix):
+    policy = get_policy()
+    if policy == 'literal':
+        return re.compile(re.escape(pattern) + suffix, flags)
+    if policy == 'reject':
+        reason = analyze(pattern + suffix, flags)
+        if reason:
+            logger.warning('Regex %r rejected : %s', pattern, reason)
+            return UnsafePatternError('%s : %s' % (pattern, reason))
+    return re.compile(pattern + suffix, flags)
+
+
+def compile(pattern, flags=0, suffix=''):
+    r"""Compile a pattern following BEST_TEMPLATETAGS_REGEX_POLICY setting
+
+    It raises UnsafePatternError if the pattern is rejected. Compiled
+    patterns and rejections are cached. suffix is a trusted regex appended to
+    the pattern : it is never escaped by the 'literal' policy.
+
+    Example:
+
+        >>> from django.test import override_settings
+        >>> from best_templatetags import saferegex
+        >>> with override_settings(BEST_TEMPLATETAGS_REGEX_POLICY='literal'):
+        ...     saferegex.compile('(a+)+.c').pattern
+        '\\(a\\+\\)\\+\\.c'
+        >>> with override_settings(BEST_TEMPLATETAGS_REGEX_POLICY='literal'):
+        ...     saferegex.compile('.', suffix='.*').pattern
+        '\\..*'
+    """
+    regex = _compiled.get_or_set((pattern, flags, suffix),
+                                 lambda: _compile(pattern, flags, suffix))
+    if isinstance(regex, UnsafePatternError):
+        raise regex
+    return regex
+
+
+def too_long(value):
+    """Tell whether a string is over BEST_TEMPLATETAGS_REGEX_MAX_INPUT"""
+    max_input = getattr(settings, 'BEST_TEMPLATETAGS_REGEX_MAX_INPUT', None)
+    return max_input is not None and len(value) > max_input
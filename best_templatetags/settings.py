@@ -38,6 +38,7 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
     'best_templatetags',
+    'best_templatetags.demo',
 ]
 
 MIDDLEWARE = [
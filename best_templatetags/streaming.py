@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+'''
+Stream a template rendering by chunks
+
+The Django engine builds the whole output in memory before returning it.
+stream_template() walks the compiled nodelist instead and yields the output
+by chunks, so big exports can be sent with a StreamingHttpResponse ::
+
+    from django.http import StreamingHttpResponse
+    from best_templatetags.streaming import stream_template
+
+    def export(request):
+        return StreamingHttpResponse(
+            stream_template('export.csv', {'rows': Row.objects.all()},
+                            request),
+            content_type='text/csv')
+
+{% for %} loops are rendered item by item, and an unevaluated QuerySet is
+read with iterator() so its rows are not all kept in memory (except when it
+uses prefetch_related(), which iterator() ignores before Django 4.1, so it
+is evaluated as usual to avoid one query per row). {% extends %},
+{% block %} and {% render_template %} contents are streamed too ; any other
+node is rendered at once.
+
+@author: Eric Lapouyade
+'''
+from django.conf import settings
+from django.template import loader
+from django.template.base import TextNode
+from django.template.context import make_context
+from django.template.defaulttags import ForNode
+from django.template.loader_tags import (BLOCK_CONTEXT_KEY, BlockContext,
+                                         BlockNode, ExtendsNode)
+
+from .templatetags.best_tags import Render_templateNode
+from .utils import is_unevaluated_queryset
+
+DEFAULT_FLUSH_SIZE = 64 * 1024
+
+
+def stream_template(template, context=None, request=None, flush_size=None):
+    """Render a template and yield its output by chunks of about flush_size
+
+    template can be a template name, a template from the Django backend or a
+    django.template.Template. flush_size defaults to the
+    BEST_TEMPLATETAGS_STREAM_FLUSH_SIZE setting, or 64KB.
+    """
+    if flush_size is None:
+        flush_size = getattr(settings, 'BEST_TEMPLATETAGS_STREAM_FLUSH_SIZE',
+                             DEFAULT_FLUSH_SIZE)
+    if isinstance(template, str):
+        template = loader.get_template(template)
+    template = getattr(template, 'template', template)
+    context = make_context(context, request,
+                           autoescape=template.engine.autoescape)
+    with context.render_context.push_state(template):
+        with context.bind_template(template):
+            buffer = []
+            size = 0
+            for bit in iter_nodelist(template.nodelist, context):
+                buffer.append(bit)
+                size += len(bit)
+                if size >= flush_size:
+                    yield ''.join(buffer)
+                    buffer = []
+                    size = 0
+            if buffer:
+                yield ''.join(buffer)
+
+
+def iter_nodelist(nodelist, context):
+    for node in nodelist:
+        if isinstance(node, TextNode):
+            yield node.s
+        elif isinstance(node, ForNode):
+            yield from iter_for(node, context)
+        elif isinstance(node, ExtendsNode):
+            yield from iter_extends(node, context)
+        elif isinstance(node, BlockNode):
+            yield from iter_block(node, context)
+        elif isinstance(node, Render_templateNode):
+            template = node.get_template(context)
+            with context.render_context.push_state(template):
+                yield from iter_nodelist(template.nodelist, context)
+        else:
+            yield str(node.render_annotated(context))
+
+
+def iter_for(node, context):
+    # same as ForNode.render() but item by item
+    parentloop = context['forloop'] if 'forloop' in context else {}
+    with context.push():
+        values = node.sequence.resolve(context, ignore_failures=True)
+        if values is None:
+            values = []
+        # reverse() is a no-op on unordered QuerySets and fails on sliced
+        # ones : those are reversed in memory like ForNode.render() does
+        if is_unevaluated_queryset(values) and (not node.is_reversed or (
+                values.ordered and not values.query.is_sliced)):
+            len_values = values.count()
+            if node.is_reversed:
+                values = values.reverse()
+            values = values.iterator()
+        else:
+            if not hasattr(values, '__len__'):
+                values = list(values)
+            len_values = len(values)
+            if node.is_reversed:
+                values = reversed(values)
+        if len_values < 1:
+            yield from iter_nodelist(node.nodelist_empty, context)
+            return
+        num_loopvars = len(node.loopvars)
+        unpack = num_loopvars > 1
+        loop_dict = context['forloop'] = {'parentloop': parentloop}
+        for i, item in enumerate(values):
+            loop_dict['counter0'] = i
+            loop_dict['counter'] = i + 1
+            loop_dict['revcounter'] = len_values - i
+            loop_dict['revcounter0'] = len_values - i - 1
+            loop_dict['first'] = (i == 0)
+            loop_dict['last'] = (i == len_values - 1)
+            pop_context = False
+            if unpack:
+                try:
+                    len_item = len(item)
+                except TypeError:
+                    len_item = 1
+                if num_loopvars != len_item:
+                    raise ValueError(
+                        'Need {} values to unpack in for loop; got {}. '
+                        .format(num_loopvars, len_item))
+                context.update(dict(zip(node.loopvars, item)))
+                pop_context = True
+            else:
+                context[node.loopvars[0]] = item
+            yield from iter_nodelist(node.nodelist_loop, context)
+            if pop_context:
+                context.pop()
+
+
+def iter_extends(node, context):
+    # same as ExtendsNode.render() but walking the parent nodelist
+    compiled_parent = node.get_parent(context)
+    if BLOCK_CONTEXT_KEY not in context.render_context:
+        context.render_context[BLOCK_CONTEXT_KEY] = BlockContext()
+    block_context = context.render_context[BLOCK_CONTEXT_KEY]
+    block_context.add_blocks(node.blocks)
+    for parent_node in compiled_parent.nodelist:
+        if not isinstance(parent_node, TextNode):
+            if not isinstance(parent_node, ExtendsNode):
+                blocks = {
+                    n.name: n for n in
+                    compiled_parent.nodelist.get_nodes_by_type(BlockNode)}
+                block_context.add_blocks(blocks)
+            break
+    with context.render_context.push_state(compiled_parent,
+                                           isolated_context=False):
+        yield from iter_nodelist(compiled_parent.nodelist, context)
+
+
+def iter_block(node, context):
+    # same as BlockNode.render() but streaming the block nodelist
+    block_context = context.render_context.get(BLOCK_CONTEXT_KEY)
+    with context.push():
+        if block_context is None:
+            context['block'] = node
+            yield from iter_nodelist(node.nodelist, context)
+            return
+        push = block = block_context.pop(node.name)
+        if block is None:
+            block = node
+        block = type(node)(block.name, block.nodelist)
+        block.context = context
+        context['block'] = block
+        yield from iter_nodelist(block.nodelist, context)
+        if push is not None:
+            block_context.push(node.name, push)
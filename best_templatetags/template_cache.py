@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+'''
+Persistent on-disk cache of templates compiled by {% render_template %}
+
+Set RENDER_TEMPLATE_CACHE_DIR in settings to enable it, and list the
+template sources to pre-compile in RENDER_TEMPLATE_PRECOMPILE : either an
+iterable of strings or the dotted path of a function returning one (for
+example, sources read from the database). Then, at each deploy ::
+
+    python manage.py precompile_render_templates
+
+Cached templates are keyed by the sha256 digest of their source, and stored
+in a sub-directory per Django and best_templatetags version, so a stale cache
+is never used. Templates that cannot be loaded are compiled as usual.
+
+The cache files are pickles : the cache directory must only be writable by
+trusted users.
+
+@author: Eric Lapouyade
+'''
+import hashlib
+import io
+import logging
+import os
+import pickle
+from importlib import import_module
+
+import django
+from django.conf import settings
+from django.template import Engine, Template
+from django.template import smartif
+from django.utils.module_loading import import_string
+
+from best_templatetags import __version__
+from best_templatetags.cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+# compiled templates kept in memory
+templates = LRUCache(maxsize=1024)
+
+
+def get_cache_dir():
+    cache_dir = getattr(settings, 'RENDER_TEMPLATE_CACHE_DIR', None)
+    if not cache_dir:
+        return None
+    return os.path.join(cache_dir, 'django-%s-best-%s' % (
+        django.get_version(), __version__))
+
+
+def cache_path(source):
+    cache_dir = get_cache_dir()
+    if cache_dir is None:
+        return None
+    digest = hashlib.sha256(source.encode('utf-8')).hexdigest()
+    return os.path.join(cache_dir, digest + '.pickle')
+
+
+def get_precompile_sources():
+    sources = getattr(settings, 'RENDER_TEMPLATE_PRECOMPILE', ())
+    if isinstance(sources, str):
+        sources = import_string(sources)
+    if callable(sources):
+        sources = sources()
+    return sources
+
+
+def _default_engine():
+    return Engine.get_default()
+
+
+def _load_filter(module, name):
+    register = getattr(import_module(module), 'register', None)
+    if register is not None and name in register.filters:
+        return register.filters[name]
+    engine = Engine.get_default()
+    for library in engine.template_builtins + list(
+            engine.template_libraries.values()):
+        if name in library.filters:
+            return library.filters[name]
+    raise pickle.UnpicklingError('Unknown filter %s' % name)
+
+
+def _smartif_operator(op_id):
+    return smartif.OPERATORS[op_id]()
+
+
+class TemplatePickler(pickle.Pickler):
+    """Pickle compiled templates
+
+    The engine is replaced by the default one when loading, filters are
+    looked up again in their library, and {% if %} operators (local classes)
+    are rebuilt from their id.
+    """
+    def reducer_override(self, obj):
+        if isinstance(obj, Engine):
+            return _default_engine, ()
+        if callable(obj) and getattr(obj, '_filter_name', None):
+            return _load_filter, (obj.__module__, obj._filter_name)
+        if isinstance(obj, smartif.TokenBase) and getattr(
+                smartif.OPERATORS.get(obj.id), '__name__', '') == 'Operator':
+            return _smartif_operator, (obj.id,), obj.__dict__
+        return NotImplemented
+
+
+def dumps(template):
+    buffer = io.BytesIO()
+    TemplatePickler(buffer, pickle.HIGHEST_PROTOCOL).dump(template)
+    return buffer.getvalue()
+
+
+def save(source, template=None):
+    """Compile a template source if needed and store it in the disk cache"""
+    path = cache_path(source)
+    if path is None:
+        return None
+    if template is None:
+        template = Template(source)
+    data = dumps(template)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = '%s.%d.tmp' % (path, os.getpid())
+    with open(tmp_path, 'wb') as fh:
+        fh.write(data)
+    os.replace(tmp_path, path)
+    return path
+
+
+def load(source):
+    """Give the compiled template from the disk cache, or None"""
+    path = cache_path(source)
+    if path is None:
+        return None
+    try:
+        with open(path, 'rb') as fh:
+            template = pickle.load(fh)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning('Stale render_template cache file %s : %s', path, e)
+        return None
+    if not isinstance(template, Template) or template.source != source:
+        return None
+    return template
+
+
+def compile_template(source):
+    template = load(source)
+    if template is None:
+        template = Template(source)
+    return template
+
+
+def get_template(source):
+    """Give a compiled template : from memory, from disk or compiled"""
+    return templates.get_or_set(source, lambda: compile_template(source))
@@ -4,23 +4,28 @@ Creation : 12 janv. 2010
 
 @author: Eric Lapouyade
 '''
-from django.conf import settings
 from django import template
-from django.utils.html import conditional_escape
 from django.template.defaultfilters import stringfilter
-from django.utils.safestring import mark_safe
 import re
 import os.path
-from bs4 import BeautifulSoup, Comment
-from django.utils.translation import ugettext as _
-import datetime
+import sys
+from decimal import Decimal
+from itertools import islice
 from django.template import Variable, VariableDoesNotExist
+from ..utils import is_unevaluated_queryset, today
+from .best_html import sanitizetags
+from ..instrumentation import instrument
+from ..cache import LRUCache
+from .. import saferegex
 
 # to get all filters :
 # grep "def " best_filters.py | sed -e 's,^def ,,' -e 's,(.*,,' | sort
 
 register = template.Library()
 
+# parsed arguments of resub filter
+_regexes = LRUCache(maxsize=256)
+
 
 @register.filter('type')
 def get_type(obj):
@@ -88,8 +93,13 @@ def multiply(val,arg):
         >>> t = '{% load best_filters %}{{ mystr|multiply:8 }}'
         >>> Template(t).render(Context(c))
         '********'
+
+        >>> c = {'price':Decimal('19.99')}
+        >>> t = '{% load best_filters %}{{ price|multiply:"3" }}'
+        >>> Template(t).render(Context(c))
+        '59.97'
     """
-    return val * arg
+    return val * _operand(val, arg)
 
 @register.filter
 def divide(val,arg):
@@ -106,8 +116,132 @@ def divide(val,arg):
         >>> t = '{% load best_filters %}{{ mystr|divide:3|floatformat:2 }}'
         >>> Template(t).render(Context(c))
         '33.33'
+
+        >>> c = {'price':Decimal('10.00')}
+        >>> t = '{% load best_filters %}{{ price|divide:"4" }}'
+        >>> Template(t).render(Context(c))
+        '2.50'
+    """
+    return val / _operand(val, arg)
+
+def _operand(val, arg):
+    # keep Decimal precision : do not mix Decimal with float or str arguments
+    if isinstance(val, Decimal) and not isinstance(arg, Decimal):
+        return Decimal(str(arg))
+    return arg
+
+def _ndarray(lst):
+    # NumPy is only used when the value is already an array, never imported
+    numpy = sys.modules.get('numpy')
+    if numpy is not None and isinstance(lst, numpy.ndarray):
+        return numpy
+    return None
+
+@register.filter
+def listmultiply(lst, arg):
+    r"""Multiply each item of a list by a value
+
+    Decimal items keep their precision, NumPy arrays are multiplied at once.
+
+    Example:
+
+        >>> c = {'prices':[Decimal('1.10'), Decimal('2.25')]}
+        >>> t = '''{% load best_filters %}
+        ... {% for p in prices|listmultiply:2 %}{{ p }} {% endfor %}'''
+        >>> Template(t).render(Context(c))
+        '\n2.20 4.50 '
+    """
+    if _ndarray(lst) is not None:
+        return lst * arg
+    return [val * _operand(val, arg) for val in lst]
+
+@register.filter
+def listdivide(lst, arg):
+    r"""Divide each item of a list by a value
+
+    Decimal items keep their precision, NumPy arrays are divided at once.
+
+    Example:
+
+        >>> c = {'prices':[Decimal('1.10'), Decimal('3.00')]}
+        >>> t = '''{% load best_filters %}
+        ... {% for p in prices|listdivide:2 %}{{ p }} {% endfor %}'''
+        >>> Template(t).render(Context(c))
+        '\n0.55 1.50 '
+    """
+    if _ndarray(lst) is not None:
+        return lst / arg
+    return [val / _operand(val, arg) for val in lst]
+
+@register.filter
+def listsum(lst):
+    """Sum all the items of a list
+
+    Example:
+
+        >>> c = {'prices':[Decimal('1.10'), Decimal('2.25')]}
+        >>> t = '{% load best_filters %}{{ prices|listsum }}'
+        >>> Template(t).render(Context(c))
+        '3.35'
+    """
+    if _ndarray(lst) is not None:
+        return lst.sum()
+    return sum(lst)
+
+@register.filter
+def listmean(lst):
+    """Give the arithmetic mean of the items of a list
+
+    Sum and count are computed in a single pass, so any iterable can be given.
+    An empty list gives an empty string.
+
+    Example:
+
+        >>> c = {'prices':[Decimal('1.10'), Decimal('2.25'), Decimal('3')]}
+        >>> t = '{% load best_filters %}{{ prices|listmean }}'
+        >>> Template(t).render(Context(c))
+        '2.116666666666666666666666667'
+    """
+    if _ndarray(lst) is not None:
+        return lst.mean() if lst.size else ''
+    total = 0
+    count = 0
+    for val in lst:
+        total += val
+        count += 1
+    if not count:
+        return ''
+    return total / _operand(total, count)
+
+@register.filter
+def listpercent(lst, ndigits=None):
+    r"""Give the percentage of the total for each item of a list
+
+    Argument is optionnal : the number of digits to round to.
+    A zero total gives zero percentages.
+
+    Example:
+
+        >>> c = {'sales':[Decimal('10'), Decimal('30')]}
+        >>> t = '''{% load best_filters %}
+        ... {% for p in sales|listpercent:1 %}{{ p }}% {% endfor %}'''
+        >>> Template(t).render(Context(c))
+        '\n25.0% 75.0% '
     """
-    return val / arg
+    numpy = _ndarray(lst)
+    if numpy is not None:
+        total = lst.sum()
+        result = lst * 100.0 / total if total else numpy.zeros(lst.shape)
+        return result if ndigits is None else result.round(int(ndigits))
+    lst = list(lst)
+    total = sum(lst)
+    if not total:
+        return [0] * len(lst)
+    hundred = _operand(total, 100)
+    result = [val * hundred / total for val in lst]
+    if ndigits is not None:
+        result = [round(val, int(ndigits)) for val in result]
+    return result
 
 @stringfilter
 @register.filter
@@ -155,14 +289,34 @@ def resub(str,arg):
         ... {{ mypath|resub:",/home/([^/]*)/projects,login=\1" }}'''
         >>> Template(t).render(Context(c))
         '\nlogin=theuser'
+
+    Patterns that may backtrack catastrophically are rejected, the string is
+    then left untouched (see :mod:`best_templatetags.saferegex`) :
+
+        >>> c = {'mystr':'aaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaa!'}
+        >>> t = '{% load best_filters %}{{ mystr|resub:"/(a+)+$/b" }}'
+        >>> Template(t).render(Context(c))
+        'aaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaa!'
     """
+    if saferegex.too_long(str):
+        return str
+    try:
+        regex, rep = _regexes.get_or_set(('resub', arg),
+                                         lambda: _parse_resub(arg))
+    except saferegex.UnsafePatternError:
+        return str
+    return regex.sub(rep,str)
+
+def _parse_resub(arg):
     sep=arg[0]
     params = arg.split(sep)
     pat = params[1]
     rep = params[2]
     flags = re.I if params[-1] == 'i' else 0
-    regex = re.compile(pat,flags=flags)
-    return regex.sub(rep,str)
+    if saferegex.get_policy() == 'literal':
+        # no group reference nor escape in the replacement either
+        return saferegex.compile(pat,flags=flags), lambda m: rep
+    return saferegex.compile(pat,flags=flags), rep
 
 @register.filter
 def age(bday, ref_date=None):
@@ -170,6 +324,8 @@ def age(bday, ref_date=None):
 
     Argument is optionnal. If not set, the refererence day is today
 
+    To compute the age in the database, see :class:`best_templatetags.db.Age`
+
     Example:
 
         >>> c = {'user_birthdate':datetime(2006,11,9),
@@ -180,7 +336,7 @@ def age(bday, ref_date=None):
 
     """
     if ref_date is None:
-        ref_date = datetime.date.today()
+        ref_date = today()
     return (ref_date.year - bday.year) - int(
         (ref_date.month, ref_date.day) < (bday.month, bday.day))
 
@@ -192,6 +348,7 @@ def truncat(str, pattern):
     Useful with filters timesince and timeuntil
     pattern is a regex expression string
     Do not forget to escape the dot (\.) if it the char you want to search
+    Patterns are checked as in :func:`resub`
 
     Examples:
 
@@ -209,107 +366,15 @@ def truncat(str, pattern):
         timesince with 2 terms : 228 years, 6 months
         timesince with 1 term : 228 years
     """
-    return re.sub(pattern+'.*', '', str)
-
-@register.filter
-def sanitizetags(value, allowed_tags=None):
-    r"""Remove all tags that is not in the allowed list
-
-    Argument should be in form 'tag1:attr1:attr2 tag2:attr1 tag3', where tags
-    are allowed HTML tags, and attrs are the allowed attributes for that tag.
-
-    In the example above, it means accepted tags are :
-    <tag1 attr1="..." attr2="..."> and <tag2 attr1="..."> and <tag3>
-    All other HTML tags an attributes will be removed.
-
-    for example <tag2 attr1="..." attr3="..."> <tag4 ...>
-    will be replaced by just <tag2 attr1="...">
-
-    The filter also unconditionnaly removes attributes having values starting
-    with 'javascript:' to avoid malicious code.
-
-    If No argument is given, the filter will look for SANITIZETAGS_ALLOWED
-    in settings or will use this default value:
-    'a:href:name b u p i h1 h2 h3 hr img:src table tr td th code'
-
-    Notes:
-
-        * The output is marked as a safe string.
-        * If the HTML given has not a correct syntax, an error html message is
-          displayed instead of the original value.
-        * Only tags are sanitized, not the text in between
-
-    Examples:
-
-        >>> c = {'comment':'''<a href="x" name="y" id="z"></a> <b></b> <u></u>
-        ... <p></p> <i></i> <h1></h1> <h2></h2> <h3></h3> <hr>
-        ... <img src="x" id="y"> <table></table> <tr></tr> <td></td> <th></th>
-        ... <code></code> <unkown_tag></unknown_tag> <div></div>'''}
-        >>> t = '{% load best_filters %}{{ comment|sanitizetags}}'
-        >>> print(Template(t).render(Context(c))) #doctest: +NORMALIZE_WHITESPACE
-        <a href="x" name="y"></a> <b></b> <u></u>
-        <p></p> <i></i> <h1></h1> <h2></h2> <h3></h3> <hr/>
-        <img src="x"/> <table></table> <tr></tr> <td></td> <th></th>
-        <code></code>
-
-        >>> c = {'comment':'My comment <b>with</b> <a href="spam">ads</a>'}
-        >>> t = '{% load best_filters %}{{ comment|sanitizetags:"B u i"}}'
-        >>> Template(t).render(Context(c))
-        'My comment <b>with</b> ads'
-
-        >>> c = {'comment':
-        ... '<i>Go</i> <a badattrib="xx" href="google.com">here</a>'}
-        >>> t = '{% load best_filters %}{{ comment|sanitizetags:"a:href"}}'
-        >>> Template(t).render(Context(c))
-        'Go <a href="google.com">here</a>'
-
-        >>> c = {'comment':'<b><i><u>nested tags</u></i></u>'}
-        >>> t = '{% load best_filters %}{{ comment|sanitizetags:"b u"}}'
-        >>> Template(t).render(Context(c))
-        '<b><u>nested tags</u></b>'
-
-        >>> c = {'comment':'''<a href="javascript:hack_me();" name="iambad">
-        ... <a href="http://google.com" name="iamgood">'''}
-        >>> t = '{% load best_filters %}{{ comment|sanitizetags:"a:href:name"}}'
-        >>> Template(t).render(Context(c))
-        '<a name="iambad">\n<a href="http://google.com" name="iamgood"></a></a>'
-    """
-    if allowed_tags==None:
-        allowed_tags = getattr(
-            settings,
-            'SANITIZETAGS_ALLOWED',
-            'a:href:name b u p i h1 h2 h3 hr img:src table tr td th code'
-        )
-    pattern = '\s*' + r'[\s]*(&#x.{1,7})?'.join(list('javascript:')) + '.*'
-    js_regex = re.compile(pattern)
-    allowed_tags = [tag.split(':') for tag in allowed_tags.lower().split()]
-    allowed_tags = dict((tag[0], tag[1:]) for tag in allowed_tags)
-
+    if saferegex.too_long(str):
+        return str
     try:
-        soup = BeautifulSoup(value, "html.parser")
-    except Exception as e:
-        return mark_safe(('<br><span class="warning">{} :<br>{}</span><br>'
-                '<pre class="sanitizetags">{}</pre>').format(
-                    str(e),
-                    _('Unable to parse the HTML text you gave. '
-                      'Please, check your syntax'),
-                    value
-                ))
-
-    for comment in soup.findAll(text=lambda text: isinstance(text, Comment)):
-        comment.extract()
-
-    for tag in soup.findAll(True):
-        if tag.name not in allowed_tags:
-            tag.hidden = True
-        else:
-            tag.attrs = dict(
-                [(attr, val) for attr, val in tag.attrs.items()
-                    if attr in allowed_tags[tag.name]
-                        and not js_regex.match(val)]
-            )
-
-    return mark_safe(soup.renderContents().decode('utf8'))
+        regex = saferegex.compile(pattern, suffix='.*')
+    except saferegex.UnsafePatternError:
+        return str
+    return regex.sub('', str)
+
+register.filter('sanitizetags', sanitizetags)
 
 @register.filter
 def get_key(object, attr):
@@ -382,3 +447,59 @@ def listsortreversed(lst,col=None):
         "\nsorted : ('a', 3)('c', 2)('b', 1)"
     """
     return reversed(listsort(lst,col))
+
+
+# number of rows fetched per database round trip by the batch filter
+BATCH_CHUNK_SIZE = 2000
+
+@register.filter
+def batch(lst, arg):
+    r""" Split a list into fixed-size rows
+
+    Argument is the row size, optionnaly followed by a coma and a fill value :
+    when a fill value is given, the last row is padded up to the row size.
+
+    Rows are produced lazily with itertools.islice, so it composes with
+    :func:`listsort` without building intermediate lists. A QuerySet that has
+    not been evaluated yet is read with iterator(), so its result cache is
+    never filled (unless it uses prefetch_related(), which iterator() ignores).
+
+    Examples :
+
+        >>> c = { 'lst': ['a','b','c','d','e'] }
+        >>> t = '''{% load best_filters %}
+        ... {% for row in lst|batch:2 %}[{{ row|join:"," }}]{% endfor %}'''
+        >>> Template(t).render(Context(c))
+        '\n[a,b][c,d][e]'
+
+        >>> c = { 'lst': ['c','e','a','d','b'] }
+        >>> t = '''{% load best_filters %}
+        ... {% for row in lst|listsort|batch:"3,-" %}[{{ row|join:"," }}]{% endfor %}'''
+        >>> Template(t).render(Context(c))
+        '\n[a,b,c][d,e,-]'
+    """
+    fill = None
+    if isinstance(arg, str) and ',' in arg:
+        arg, fill = arg.split(',', 1)
+    size = int(arg)
+    if size < 1:
+        raise ValueError('batch size must be a positive integer')
+    if lst is None or isinstance(lst, str) and not lst:
+        return iter(())
+    if is_unevaluated_queryset(lst):
+        it = lst.iterator(chunk_size=BATCH_CHUNK_SIZE)
+    else:
+        it = iter(lst)
+    return _batch_rows(it, size, fill)
+
+def _batch_rows(it, size, fill):
+    while True:
+        row = list(islice(it, size))
+        if not row:
+            return
+        if fill is not None and len(row) < size:
+            row.extend([fill] * (size - len(row)))
+        yield row
+
+
+instrument(register, 'best_filters')
@@ -0,0 +1,291 @@
+# -*- coding: utf-8 -*-
+'''
+HTML filters : they are heavier than the ones in best_filters
+
+@author: Eric Lapouyade
+'''
+from django.conf import settings
+from django import template
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+from django.utils.translation import ugettext as _
+import logging
+import re
+import threading
+from collections import Counter
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import repeat
+from ..instrumentation import instrument
+from ..cache import LRUCache
+
+register = template.Library()
+
+JS_REGEX = re.compile(
+    r'\s*' + r'[\s]*(&#x.{1,7})?'.join(list('javascript:')) + '.*')
+
+# parsed allowed_tags arguments of sanitizetags
+_policies = LRUCache(maxsize=64)
+
+
+@register.filter
+def sanitizetags(value, allowed_tags=None):
+    r"""Remove all tags that is not in the allowed list
+
+    Argument should be in form 'tag1:attr1:attr2 tag2:attr1 tag3', where tags
+    are allowed HTML tags, and attrs are the allowed attributes for that tag.
+
+    In the example above, it means accepted tags are :
+    <tag1 attr1="..." attr2="..."> and <tag2 attr1="..."> and <tag3>
+    All other HTML tags an attributes will be removed.
+
+    for example <tag2 attr1="..." attr3="..."> <tag4 ...>
+    will be replaced by just <tag2 attr1="...">
+
+    The filter also unconditionnaly removes attributes having values starting
+    with 'javascript:' to avoid malicious code.
+
+    If No argument is given, the filter will look for SANITIZETAGS_ALLOWED
+    in settings or will use this default value:
+    'a:href:name b u p i h1 h2 h3 hr img:src table tr td th code'
+
+    Notes:
+
+        * The output is marked as a safe string.
+        * If the HTML given has not a correct syntax, an error html message is
+          displayed instead of the original value.
+        * Only tags are sanitized, not the text in between
+        * The filter is also available with {% load best_filters %}
+        * Hostile input is bounded : see :func:`get_sanitize_bailouts`
+
+    Examples:
+
+        >>> c = {'comment':'''<a href="x" name="y" id="z"></a> <b></b> <u></u>
+        ... <p></p> <i></i> <h1></h1> <h2></h2> <h3></h3> <hr>
+        ... <img src="x" id="y"> <table></table> <tr></tr> <td></td> <th></th>
+        ... <code></code> <unkown_tag></unknown_tag> <div></div>'''}
+        >>> t = '{% load best_html %}{{ comment|sanitizetags}}'
+        >>> print(Template(t).render(Context(c))) #doctest: +NORMALIZE_WHITESPACE
+        <a href="x" name="y"></a> <b></b> <u></u>
+        <p></p> <i></i> <h1></h1> <h2></h2> <h3></h3> <hr/>
+        <img src="x"/> <table></table> <tr></tr> <td></td> <th></th>
+        <code></code>
+
+        >>> c = {'comment':'My comment <b>with</b> <a href="spam">ads</a>'}
+        >>> t = '{% load best_html %}{{ comment|sanitizetags:"B u i"}}'
+        >>> Template(t).render(Context(c))
+        'My comment <b>with</b> ads'
+
+        >>> c = {'comment':
+        ... '<i>Go</i> <a badattrib="xx" href="google.com">here</a>'}
+        >>> t = '{% load best_html %}{{ comment|sanitizetags:"a:href"}}'
+        >>> Template(t).render(Context(c))
+        'Go <a href="google.com">here</a>'
+
+        >>> c = {'comment':'<b><i><u>nested tags</u></i></u>'}
+        >>> t = '{% load best_html %}{{ comment|sanitizetags:"b u"}}'
+        >>> Template(t).render(Context(c))
+        '<b><u>nested tags</u></b>'
+
+        >>> c = {'comment':'''<a href="javascript:hack_me();" name="iambad">
+        ... <a href="http://google.com" name="iamgood">'''}
+        >>> t = '{% load best_html %}{{ comment|sanitizetags:"a:href:name"}}'
+        >>> Template(t).render(Context(c))
+        '<a name="iambad">\n<a href="http://google.com" name="iamgood"></a></a>'
+    """
+    if allowed_tags==None:
+        allowed_tags = get_default_allowed_tags()
+    allowed_tags = _policies.get_or_set(
+        allowed_tags, lambda: parse_allowed_tags(allowed_tags))
+
+    # bs4 is imported only when needed : it is slow to import
+    from bs4 import Comment
+
+    max_bytes = getattr(settings, 'SANITIZETAGS_MAX_BYTES', 2 * 1024 * 1024)
+    if isinstance(value, str) and len(value) * 4 > max_bytes and len(
+            value.encode('utf-8')) > max_bytes:
+        return _bailout('bytes', value)
+
+    try:
+        soup = _get_limited_soup_class()(
+            value, "html.parser",
+            max_depth=getattr(settings, 'SANITIZETAGS_MAX_DEPTH', 256),
+            max_elements=getattr(settings, 'SANITIZETAGS_MAX_ELEMENTS',
+                                 50000))
+    except SanitizeLimitExceeded as e:
+        return _bailout(e.reason, value)
+    except Exception as e:
+        return mark_safe(('<br><span class="warning">{} :<br>{}</span><br>'
+                '<pre class="sanitizetags">{}</pre>').format(
+                    str(e),
+                    _('Unable to parse the HTML text you gave. '
+                      'Please, check your syntax'),
+                    value
+                ))
+
+    for comment in soup.findAll(text=lambda text: isinstance(text, Comment)):
+        comment.extract()
+
+    for tag in soup.findAll(True):
+        if tag.name not in allowed_tags:
+            tag.hidden = True
+        else:
+            tag.attrs = dict(
+                [(attr, val) for attr, val in tag.attrs.items()
+                    if attr in allowed_tags[tag.name]
+                        and not JS_REGEX.match(val)]
+            )
+
+    return mark_safe(soup.renderContents().decode('utf8'))
+
+
+class SanitizeLimitExceeded(Exception):
+    def __init__(self, reason):
+        super().__init__('HTML %s limit exceeded' % reason)
+        self.reason = reason
+
+_limited_soup_class = None
+
+def _get_limited_soup_class():
+    # built on first use, so bs4 is not imported with the library
+    global _limited_soup_class
+    if _limited_soup_class is None:
+        from bs4 import BeautifulSoup
+
+        class LimitedSoup(BeautifulSoup):
+            """BeautifulSoup stopping the parsing as soon as the nesting depth
+            or the number of elements is over the limits"""
+            def __init__(self, markup, features, max_depth, max_elements):
+                self.max_depth = max_depth
+                self.max_elements = max_elements
+                super().__init__(markup, features)
+
+            def reset(self):
+                self.elements = -1  # the soup itself is pushed first
+                super().reset()
+
+            def pushTag(self, tag):
+                super().pushTag(tag)
+                self.elements += 1
+                if len(self.tagStack) > self.max_depth + 1:
+                    raise SanitizeLimitExceeded('depth')
+                if self.elements > self.max_elements:
+                    raise SanitizeLimitExceeded('elements')
+
+        _limited_soup_class = LimitedSoup
+    return _limited_soup_class
+
+logger = logging.getLogger('best_templatetags.sanitizetags')
+_bailouts = Counter()
+_bailouts_lock = threading.Lock()
+
+def _bailout(reason, value):
+    with _bailouts_lock:
+        _bailouts[reason] += 1
+    logger.warning('sanitizetags : %s limit exceeded, HTML escaped', reason,
+                   extra={'reason': reason})
+    return mark_safe(escape(value))
+
+def get_sanitize_bailouts():
+    r"""Give the number of sanitizetags bail-outs per exceeded limit
+
+    To bound CPU and memory on hostile input, sanitizetags escapes the whole
+    HTML as plain text instead of parsing it when it is over one of these
+    limits (settings) :
+
+        * SANITIZETAGS_MAX_BYTES : input size in bytes (default: 2MB)
+        * SANITIZETAGS_MAX_DEPTH : elements nesting depth (default: 256)
+        * SANITIZETAGS_MAX_ELEMENTS : number of elements (default: 50000)
+
+    Depth and elements are checked while parsing, which stops as soon as a
+    limit is exceeded. Each bail-out is counted and logged as a warning on
+    the 'best_templatetags.sanitizetags' logger, so it can be alerted on.
+
+    Example:
+
+        >>> from django.test import override_settings
+        >>> from best_templatetags.templatetags.best_html import (
+        ...     get_sanitize_bailouts, reset_sanitize_bailouts, sanitizetags)
+        >>> reset_sanitize_bailouts()
+        >>> with override_settings(SANITIZETAGS_MAX_DEPTH=3):
+        ...     sanitizetags('<b><i><u>3 levels</u></i></b>', 'b i u')
+        ...     sanitizetags('<b><i><u><b>4 levels</b></u></i></b>', 'b i u')
+        '<b><i><u>3 levels</u></i></b>'
+        '&lt;b&gt;&lt;i&gt;&lt;u&gt;&lt;b&gt;4 levels&lt;/b&gt;&lt;/u&gt;&lt;/i&gt;&lt;/b&gt;'
+        >>> with override_settings(SANITIZETAGS_MAX_BYTES=10):
+        ...     sanitizetags('<b>Too long</b>')
+        '&lt;b&gt;Too long&lt;/b&gt;'
+        >>> get_sanitize_bailouts()
+        {'depth': 1, 'bytes': 1}
+    """
+    with _bailouts_lock:
+        return dict(_bailouts)
+
+def reset_sanitize_bailouts():
+    with _bailouts_lock:
+        _bailouts.clear()
+
+
+def get_default_allowed_tags():
+    return getattr(
+        settings,
+        'SANITIZETAGS_ALLOWED',
+        'a:href:name b u p i h1 h2 h3 hr img:src table tr td th code'
+    )
+
+
+def sanitize_many(values, allowed_tags=None, executor=None, workers=None,
+                  parallel_threshold=None):
+    r"""Sanitize a list of HTML fragments, the same way as :func:`sanitizetags`
+
+    Views can sanitize all the comments of a page at once before rendering,
+    and give the safe strings to the template. Identical fragments are
+    sanitized only once. It returns the results in the same order.
+
+    When there are at least parallel_threshold distinct fragments (setting
+    SANITIZETAGS_PARALLEL_THRESHOLD, default: 50), the work is spread on a
+    pool of 'workers' workers (setting SANITIZETAGS_WORKERS, default: 4).
+    executor can be 'thread' (default), 'process', or any
+    concurrent.futures.Executor instance to reuse an existing pool. Note
+    that, because of the GIL, only a process pool uses many CPUs, and that
+    starting a process pool is slow : give a long-lived one as executor.
+
+    Example:
+
+        >>> from best_templatetags.templatetags.best_html import sanitize_many
+        >>> sanitize_many(['<b>a</b><i>b</i>', '<i>c</i>', '<b>a</b><i>b</i>'],
+        ...               'b', executor='thread', parallel_threshold=1)
+        ['<b>a</b>b', 'c', '<b>a</b>b']
+    """
+    if allowed_tags is None:
+        allowed_tags = get_default_allowed_tags()
+    if parallel_threshold is None:
+        parallel_threshold = getattr(settings,
+                                     'SANITIZETAGS_PARALLEL_THRESHOLD', 50)
+    if workers is None:
+        workers = getattr(settings, 'SANITIZETAGS_WORKERS', 4)
+    values = list(values)
+    unique = list(dict.fromkeys(values))
+    if len(unique) < parallel_threshold or workers < 2:
+        results = [sanitizetags(value, allowed_tags) for value in unique]
+    elif isinstance(executor, Executor):
+        results = list(executor.map(sanitizetags, unique,
+                                    repeat(allowed_tags)))
+    else:
+        pool_class = (ProcessPoolExecutor if executor == 'process'
+                      else ThreadPoolExecutor)
+        with pool_class(max_workers=workers) as pool:
+            chunksize = max(1, len(unique) // (workers * 4))
+            results = list(pool.map(sanitizetags, unique,
+                                    repeat(allowed_tags),
+                                    chunksize=chunksize))
+    sanitized = dict(zip(unique, results))
+    return [sanitized[value] for value in values]
+
+
+def parse_allowed_tags(allowed_tags):
+    """Parse 'tag1:attr1:attr2 tag2' into {'tag1': ['attr1', 'attr2'], ...}"""
+    allowed_tags = [tag.split(':') for tag in allowed_tags.lower().split()]
+    return dict((tag[0], tag[1:]) for tag in allowed_tags)
+
+
+instrument(register, 'best_html')
@@ -4,12 +4,20 @@ Création : 12 janv. 2010
 
 @author: Eric Lapouyade
 '''
-from django.template import Template
 from urllib.parse import urlsplit, urlunsplit
 from django import template
 from django.http import QueryDict
 from django.utils.safestring import mark_safe
 import hashlib
+import logging
+import re
+import sys
+import time
+from django.conf import settings
+from django.db.models.query import QuerySet
+from django.utils.functional import LazyObject, empty
+from ..instrumentation import instrument
+from .. import template_cache
 
 
 register = template.Library()
@@ -154,8 +162,15 @@ def render_template(value):
     """ Render a string as it was a Django template
 
     It will use the same context as the outer template.
+    Compiled templates are cached in memory, and on disk if
+    RENDER_TEMPLATE_CACHE_DIR is set in settings
+    (see :mod:`best_templatetags.template_cache`).
 
-    Example:
+    If the value starts with 'name:' or if 'by_name' is given after it, the
+    value is a template name : the template is then loaded by the engine of
+    the outer template, so it benefits from its cached loader.
+
+    Examples:
 
         >>> c = {'mytemplate':'my value = {{myvar}}',
         ...      'myvar':'myvalue'}
@@ -167,20 +182,351 @@ def render_template(value):
         with myvar = myvalue
         My template rendered : my value = myvalue
 
+        >>> from django.template import Context, Engine
+        >>> engine = Engine(
+        ...     loaders=[('django.template.loaders.locmem.Loader',
+        ...               {'snippet.html': 'my value = {{myvar}}'})],
+        ...     libraries={'best_tags':
+        ...                'best_templatetags.templatetags.best_tags'})
+        >>> c = {'myname':'snippet.html', 'myvar':'myvalue'}
+        >>> t = '''{% load best_tags %}{% render_template "name:snippet.html" %}
+        ... {% render_template myname by_name %}'''
+        >>> print(engine.from_string(t).render(Context(c)))
+        my value = myvalue
+        my value = myvalue
     """
 
 class Render_templateNode(template.Node):
-    def __init__(self, value):
+    def __init__(self, value, by_name=False):
         self.value = value
+        self.by_name = by_name
+
+    def get_template(self, context):
+        value = self.value.resolve(context, True)
+        if self.by_name or value.startswith('name:'):
+            if not self.by_name:
+                value = value[len('name:'):]
+            engine = getattr(context.template, 'engine', None)
+            if engine is None:
+                engine = template.Engine.get_default()
+            return engine.get_template(value)
+        return template_cache.get_template(value)
 
     def render(self, context):
-        t = Template(self.value.resolve(context, True))
-        return t.render(context)
+        return self.get_template(context).render(context)
 
 @register.tag('render_template')
 def do_render_template(parser, token):
     bits = token.contents.split()
-    if len(bits) != 2:
-        raise template.TemplateSyntaxError("'%s' tag takes 1 argument" % bits[0])
+    by_name = len(bits) == 3 and bits[2] == 'by_name'
+    if len(bits) != 2 and not by_name:
+        raise template.TemplateSyntaxError(
+            "'%s' tag takes 1 argument, optionnaly followed by 'by_name'"
+            % bits[0])
     value = parser.compile_filter(bits[1])
-    return Render_templateNode(value)
\ No newline at end of file
+    return Render_templateNode(value, by_name)
+
+
+def profile(label):
+    # fake function for sphinx autodoc and doctest, do not remove
+    r""" Time each child node of the block and report the slowest ones
+
+    The slowest nodes are logged on the 'best_templatetags.profile' logger
+    with their template position. When DEBUG is on, the report is also
+    appended as an HTML comment. The number of reported nodes is given by
+    the PROFILE_TOP setting (default: 5).
+
+    Example:
+
+        >>> from django.test import override_settings
+        >>> c = {'mytemplate':'{{ myvar }}', 'myvar':'myvalue'}
+        >>> t = '''{% load best_tags %}{% profile "page" %}
+        ... {% render_template mytemplate %}{% endprofile %}'''
+        >>> Template(t).render(Context(c))
+        '\nmyvalue'
+        >>> with override_settings(DEBUG=True):
+        ...     print(Template(t).render(Context(c))) #doctest: +ELLIPSIS
+        <BLANKLINE>
+        myvalue<!-- profile "page" : ... ms
+        ... ms line 2 : {% render_template mytemplate %}
+        ... ms line 1 : text
+        -->
+    """
+
+class ProfileNode(template.Node):
+    logger = logging.getLogger('best_templatetags.profile')
+
+    def __init__(self, label, nodelist):
+        self.label = label
+        self.nodelist = nodelist
+
+    def describe(self, node):
+        token = getattr(node, 'token', None)
+        if token is None or isinstance(node, template.base.TextNode):
+            what = 'text'
+        elif isinstance(node, template.base.VariableNode):
+            what = '{{ %s }}' % token.contents
+        else:
+            what = '{%% %s %%}' % token.contents
+        origin = getattr(node, 'origin', None)
+        name = getattr(origin, 'template_name', None)
+        lineno = getattr(token, 'lineno', '?')
+        if name:
+            return '%s line %s : %s' % (name, lineno, what)
+        return 'line %s : %s' % (lineno, what)
+
+    def render(self, context):
+        label = self.label.resolve(context, True) if self.label else ''
+        bits = []
+        timings = []
+        start = time.perf_counter()
+        for node in self.nodelist:
+            node_start = time.perf_counter()
+            bits.append(str(node.render_annotated(context)))
+            timings.append((time.perf_counter() - node_start, node))
+        total = time.perf_counter() - start
+        timings.sort(key=lambda t: t[0], reverse=True)
+        top = getattr(settings, 'PROFILE_TOP', 5)
+        lines = ['%.3f ms %s' % (elapsed * 1e3, self.describe(node))
+                 for elapsed, node in timings[:top]]
+        self.logger.info('profile "%s" : %.3f ms\n%s',
+                         label, total * 1e3, '\n'.join(lines))
+        output = ''.join(bits)
+        if settings.DEBUG:
+            report = 'profile "%s" : %.3f ms\n%s\n' % (
+                label, total * 1e3, '\n'.join(lines))
+            output += '<!-- %s-->' % report.replace('--', '- -')
+        return mark_safe(output)
+
+@register.tag('profile')
+def do_profile(parser, token):
+    bits = token.split_contents()
+    if len(bits) > 2:
+        raise template.TemplateSyntaxError(
+            "'%s' tag takes at most 1 argument" % bits[0])
+    label = parser.compile_filter(bits[1]) if len(bits) == 2 else None
+    nodelist = parser.parse(('endprofile',))
+    parser.delete_first_token()
+    return ProfileNode(label, nodelist)
+
+
+def minify():
+    # fake function for sphinx autodoc and doctest, do not remove
+    r""" Minify the HTML rendered inside the block
+
+    In one pass, whitespace runs are collapsed into one space and HTML
+    comments are removed. The content of <pre>, <textarea>, <script> and
+    <style> elements is left untouched.
+
+    When the block contains no variable nor tag, it is minified only once
+    per process.
+
+    Example:
+
+        >>> c = {'code':'a  =  1'}
+        >>> t = '''{% load best_tags %}{% minify %}
+        ... <div>
+        ...     <!-- menu -->
+        ...     <p>  Hello   world  </p>
+        ...     <pre>{{ code }}
+        ...   indented</pre>
+        ... </div>
+        ... {% endminify %}'''
+        >>> Template(t).render(Context(c))
+        ' <div> <p> Hello world </p> <pre>a  =  1\n  indented</pre> </div> '
+    """
+
+MINIFY_START_RE = re.compile(r'<!--|<(pre|textarea|script|style)\b', re.I)
+MINIFY_END_RES = {name: re.compile(r'</%s\s*>' % name, re.I)
+                  for name in ('pre', 'textarea', 'script', 'style')}
+SPACES_RE = re.compile(r'\s+')
+
+def minify_html(html):
+    """ Collapse whitespace and remove comments out of pre, textarea,
+    script and style elements
+
+    The string is scanned once : an unclosed comment or element leaves the
+    rest of the string untouched, so the time stays linear on any input.
+    """
+    output = []
+    text = []  # text to collapse, comments already removed
+    pos = 0
+    while True:
+        m = MINIFY_START_RE.search(html, pos)
+        if m is None:
+            text.append(html[pos:])
+            break
+        text.append(html[pos:m.start()])
+        if m.group(1):
+            closing = MINIFY_END_RES[m.group(1).lower()].search(html, m.end())
+            end = closing.end() if closing else -1
+        else:
+            end = html.find('-->', m.end())
+            if end >= 0:
+                # comment : removed, whitespace around it is collapsed
+                pos = end + 3
+                continue
+        output.append(SPACES_RE.sub(' ', ''.join(text)))
+        text = []
+        if end < 0:
+            output.append(html[m.start():])
+            return ''.join(output)
+        output.append(html[m.start():end])
+        pos = end
+    output.append(SPACES_RE.sub(' ', ''.join(text)))
+    return ''.join(output)
+
+class MinifyNode(template.Node):
+    def __init__(self, nodelist):
+        self.nodelist = nodelist
+        self.static = all(isinstance(node, template.base.TextNode)
+                          for node in nodelist)
+        self.minified = None
+
+    def render(self, context):
+        if self.static:
+            if self.minified is None:
+                self.minified = mark_safe(
+                    minify_html(self.nodelist.render(context)))
+            return self.minified
+        return mark_safe(minify_html(self.nodelist.render(context)))
+
+@register.tag('minify')
+def do_minify(parser, token):
+    bits = token.split_contents()
+    if len(bits) != 1:
+        raise template.TemplateSyntaxError(
+            "'%s' tag takes no argument" % bits[0])
+    nodelist = parser.parse(('endminify',))
+    parser.delete_first_token()
+    return MinifyNode(nodelist)
+
+
+def inspect_context():
+    # fake function for sphinx autodoc and doctest, do not remove
+    r""" Report the size of each variable of the context
+
+    For debugging renders using a lot of memory : each variable of the
+    context stack is reported with its type, its approximate deep size in
+    bytes and, for sequences and QuerySets, its number of elements. For a
+    QuerySet or a lazy object like request.user, it also tells whether it
+    has already been evaluated : it is never evaluated by the tag. Variables
+    are sorted by size.
+
+    The report is logged on the 'best_templatetags.inspect_context' logger
+    and appended as an HTML comment. The tag does nothing unless DEBUG or
+    the INSPECT_CONTEXT setting is on.
+
+    Example:
+
+        >>> from django.test import override_settings
+        >>> c = {'big':list(range(1000)), 'small':'hello'}
+        >>> t = '{% load best_tags %}{% inspect_context %}'
+        >>> Template(t).render(Context(c))
+        ''
+        >>> with override_settings(DEBUG=True):
+        ...     print(Template(t).render(Context(c))) #doctest: +ELLIPSIS
+        <!-- inspect_context :
+        big : list, ... bytes, 1000 items
+        small : str, ... bytes
+        -->
+    """
+
+# do not go deeper when computing sizes
+INSPECT_MAX_DEPTH = 10
+
+def _deep_sizeof(obj, seen, depth=0):
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj, 0)
+    if depth >= INSPECT_MAX_DEPTH:
+        return size
+    depth += 1
+    if isinstance(obj, LazyObject):
+        wrapped = object.__getattribute__(obj, '_wrapped')
+        return size if wrapped is empty else size + _deep_sizeof(
+            wrapped, seen, depth)
+    if isinstance(obj, QuerySet):
+        if obj._result_cache is None:
+            return size  # unevaluated QuerySet
+        return size + _deep_sizeof(obj._result_cache, seen, depth)
+    if isinstance(obj, (str, bytes, int, float, bool, type(None), type)):
+        return size
+    if isinstance(obj, dict):
+        # no temporary (key, value) tuple : its id() would be reused
+        for key, value in obj.items():
+            size += _deep_sizeof(key, seen, depth)
+            size += _deep_sizeof(value, seen, depth)
+        return size
+    if type(obj) in (list, tuple, set, frozenset):
+        for item in obj:
+            size += _deep_sizeof(item, seen, depth)
+        return size
+    try:
+        attrs = object.__getattribute__(obj, '__dict__')
+    except AttributeError:
+        return size
+    return size + _deep_sizeof(attrs, seen, depth)
+
+def describe_variable(value):
+    """ Give (type name, deep size, number of items or None, evaluated or
+    None) without evaluating QuerySets or lazy objects """
+    if isinstance(value, LazyObject):
+        # any other attribute access would evaluate it
+        wrapped = object.__getattribute__(value, '_wrapped')
+        if wrapped is empty:
+            size = _deep_sizeof(value, set())
+            return type(value).__name__, size, None, False
+        type_name, size, count, evaluated = describe_variable(wrapped)
+        size += sys.getsizeof(value, 0)
+        return type_name, size, count, True if evaluated is None else evaluated
+    type_name = type(value).__name__
+    size = _deep_sizeof(value, set())
+    count = None
+    evaluated = None
+    if isinstance(value, QuerySet):
+        evaluated = value._result_cache is not None
+        if evaluated:
+            count = len(value._result_cache)
+    elif isinstance(value, (list, tuple, set, frozenset, dict, range)):
+        count = len(value)
+    return type_name, size, count, evaluated
+
+class InspectContextNode(template.Node):
+    logger = logging.getLogger('best_templatetags.inspect_context')
+
+    def render(self, context):
+        if not (settings.DEBUG or getattr(settings, 'INSPECT_CONTEXT',
+                                          False)):
+            return ''
+        variables = {}
+        for d in context.dicts:
+            if d is context.dicts[0] and d.get('True') is True:
+                continue  # builtins : True, False, None
+            variables.update(d)
+        lines = []
+        for name, value in variables.items():
+            type_name, size, count, evaluated = describe_variable(value)
+            line = '%s : %s, %d bytes' % (name, type_name, size)
+            if evaluated is not None:
+                line += ', evaluated' if evaluated else ', not evaluated'
+            if count is not None:
+                line += ', %d items' % count
+            lines.append((size, line))
+        lines.sort(key=lambda l: l[0], reverse=True)
+        report = '\n'.join(line for size, line in lines)
+        self.logger.info('inspect_context :\n%s', report)
+        return mark_safe('<!-- inspect_context :\n%s\n-->'
+                         % report.replace('--', '- -'))
+
+@register.tag('inspect_context')
+def do_inspect_context(parser, token):
+    bits = token.split_contents()
+    if len(bits) != 1:
+        raise template.TemplateSyntaxError(
+            "'%s' tag takes no argument" % bits[0])
+    return InspectContextNode()
+
+
+instrument(register, 'best_tags')
@@ -0,0 +1,61 @@
+import unittest
+from importlib import import_module
+
+from best_templatetags import benchmarks
+
+
+class BenchmarkCasesTest(unittest.TestCase):
+    def test_every_filter_and_tag_has_a_case(self):
+        for library in ('best_filters', 'best_html', 'best_tags'):
+            register = import_module(
+                'best_templatetags.templatetags.' + library).register
+            for name in list(register.filters) + list(register.tags):
+                names = [c.name.split('.')[-1] for c in benchmarks.CASES
+                         if c.library == library]
+                self.assertTrue(
+                    any(n == name or n.startswith(name + '_')
+                        for n in names),
+                    'No benchmark case for %s.%s' % (library, name))
+
+    def test_smallest_size_runs(self):
+        data = benchmarks.run(max_size=16, repeat=1, min_time=0)
+        self.assertIn('hash[16]', data['results'])
+        self.assertIn('listsort[10]', data['results'])
+
+    def test_compare(self):
+        baseline = {'results': {'a[10]': {'min': 1.0, 'median': 1.0},
+                                'b[10]': {'min': 1.0, 'median': 1.0}}}
+        data = {'results': {'a[10]': {'min': 1.1, 'median': 1.1},
+                            'b[10]': {'min': 1.3, 'median': 1.3},
+                            'c[10]': {'min': 9.0, 'median': 9.0}}}
+        self.assertEqual(benchmarks.compare(data, baseline, tolerance=0.2),
+                         [('b[10]', 1.0, 1.3)])
+
+    def test_memory(self):
+        cases = benchmarks.runner.select_cases(['multiply_str'])
+        data = benchmarks.run_memory(cases)
+        small = data['results']['multiply_str[16]']
+        big = data['results']['multiply_str[1048576]']
+        self.assertGreater(big['peak'], 3 * 1024 * 1024)
+        self.assertLess(small['peak'], big['peak'])
+        # the 3MB output is released before the snapshot
+        self.assertLess(big['retained_blocks'], 1000)
+        self.assertEqual(
+            [key for key, ref, current in
+             benchmarks.compare(data, {'results': {
+                 'multiply_str[16]': small,
+                 'multiply_str[1048576]': dict(big, peak=big['peak'] / 2)}},
+                 metric='peak')],
+            ['multiply_str[1048576]'])
+        data = {'results': {'a[10]': {'retained_blocks': 4}}}
+        baseline = {'results': {'a[10]': {'retained_blocks': 3}}}
+        self.assertEqual(len(benchmarks.compare(
+            data, baseline, metric='retained_blocks')), 1)
+        self.assertEqual(benchmarks.compare(
+            data, baseline, metric='retained_blocks', slack=10), [])
+
+    def test_threads(self):
+        data = benchmarks.run_threads(threads=(1, 2), duration=0.05)
+        self.assertEqual(sorted(data['results']),
+                         ['LRUCache[1 threads]', 'LRUCache[2 threads]'])
+        self.assertGreater(data['results']['LRUCache[2 threads]']['ops'], 0)
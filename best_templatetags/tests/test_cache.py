@@ -0,0 +1,77 @@
+import threading
+
+from django.test import SimpleTestCase, override_settings
+
+from best_templatetags.cache import LRUCache
+
+
+class LRUCacheTest(SimpleTestCase):
+    def test_lru_eviction(self):
+        cache = LRUCache(maxsize=2, shards=1)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        self.assertEqual(cache.get('a'), 1)
+        cache.set('c', 3)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), 1)
+        self.assertEqual(len(cache), 2)
+
+    def test_cleared_on_setting_changed(self):
+        cache = LRUCache()
+        cache.set('a', 1)
+        with override_settings(SANITIZETAGS_ALLOWED='b'):
+            self.assertIsNone(cache.get('a'))
+
+    def test_threads(self):
+        cache = LRUCache(maxsize=256, shards=16)
+        errors = []
+
+        def worker(n):
+            for i in range(5000):
+                key = (n * 7919 + i) % 500
+                value = cache.get_or_set(key, lambda: key * 2)
+                if value != key * 2:
+                    errors.append((key, value))
+        workers = [threading.Thread(target=worker, args=(n,))
+                   for n in range(8)]
+        for t in workers:
+            t.start()
+        for t in workers:
+            t.join()
+        self.assertEqual(errors, [])
+        self.assertLessEqual(len(cache), 256)
+        for entries, lock in cache.shards:
+            self.assertLessEqual(len(entries), cache.shard_size)
+            for key, value in entries.items():
+                self.assertEqual(value, key * 2)
+
+    def test_no_global_lock(self):
+        cache = LRUCache(maxsize=256, shards=16)
+        other = next(k for k in range(1, 100)
+                     if cache.shard(k) is not cache.shard(0))
+        thread = threading.Thread(target=cache.get_or_set,
+                                  args=(other, lambda: 'x'))
+        with cache.shard(0)[1]:  # a render holds the lock of one shard
+            thread.start()
+            thread.join(5)
+            # the other shard is not blocked
+            self.assertFalse(thread.is_alive())
+        self.assertEqual(cache.get(other), 'x')
+
+    def test_factory_runs_without_lock(self):
+        cache = LRUCache(maxsize=256, shards=1)
+        started = threading.Event()
+        release = threading.Event()
+
+        def slow():
+            started.set()
+            release.wait(5)
+            return 'slow'
+        thread = threading.Thread(target=cache.get_or_set, args=(0, slow))
+        thread.start()
+        self.assertTrue(started.wait(5))
+        # same shard : the slow factory must not block it
+        self.assertEqual(cache.get_or_set(1, lambda: 'fast'), 'fast')
+        release.set()
+        thread.join()
+        self.assertEqual(cache.get(0), 'slow')
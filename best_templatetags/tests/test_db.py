@@ -0,0 +1,54 @@
+import datetime
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.utils import timezone
+
+from best_templatetags.db import Age, annotate_age
+from best_templatetags.templatetags.best_filters import age, batch
+
+
+class AgeExpressionTest(TestCase):
+    def setUp(self):
+        for username, day in (('leap', datetime.datetime(2000, 2, 29)),
+                              ('nov', datetime.datetime(2006, 11, 9)),
+                              ('jan', datetime.datetime(2006, 1, 21))):
+            User.objects.create(username=username,
+                                date_joined=timezone.make_aware(day))
+
+    def test_same_as_filter(self):
+        for ref_date in (datetime.date(2018, 1, 20),
+                         datetime.date(2018, 1, 21),
+                         datetime.date(2001, 2, 28),
+                         datetime.date(2001, 3, 1),
+                         datetime.date(2004, 2, 29)):
+            for user in annotate_age(User.objects.all(), 'date_joined',
+                                     ref_date=ref_date):
+                self.assertEqual(user.age, age(user.date_joined, ref_date))
+
+    def test_order_and_filter(self):
+        qs = User.objects.annotate(
+            years=Age('date_joined', datetime.date(2018, 1, 21)))
+        self.assertEqual(
+            list(qs.filter(years__lt=17).order_by('years')
+                 .values_list('username', flat=True)),
+            ['nov', 'jan'])
+
+
+class BatchQuerySetTest(TestCase):
+    def setUp(self):
+        for name in ('ann', 'bob', 'cid', 'dan', 'eve'):
+            User.objects.create(username=name)
+
+    def test_result_cache_not_filled(self):
+        users = User.objects.order_by('username')
+        with self.assertNumQueries(1):
+            rows = [[getattr(u, 'username', u) for u in row]
+                    for row in batch(users, '2,-')]
+        self.assertEqual(rows, [['ann', 'bob'], ['cid', 'dan'], ['eve', '-']])
+        self.assertIsNone(users._result_cache)
+
+    def test_empty_queryset(self):
+        users = User.objects.none()
+        self.assertEqual(list(batch(users, 2)), [])
+        self.assertIsNone(users._result_cache)
@@ -0,0 +1,42 @@
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from best_templatetags.demo import loadtest
+from best_templatetags.demo.models import Snippet
+
+
+class DemoViewsTest(TestCase):
+    def test_comments(self):
+        response = self.client.get('/demo/comments/?n=20')
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'class="author"', count=20)
+        self.assertNotContains(response, '<script>')
+        self.assertNotContains(response, 'javascript:')
+
+    def test_table(self):
+        response = self.client.get('/demo/table/?page=3&sort=name')
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'href="/demo/table/?sort=price"')
+        self.assertContains(response, 'href="/demo/table/?page=4&sort=name"')
+        self.assertRegex(response.content.decode(),
+                         r'href="/demo/table/\?page=3&sort=name#\d+"')
+
+    def test_snippets(self):
+        response = self.client.get('/demo/snippets/')
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, '<h1>SNIPPETS</h1>')
+        self.assertContains(response, '<span>36</span>')
+        self.assertContains(response, 'Eric, 39 years old')
+        self.assertEqual(Snippet.objects.count(), 4)
+
+
+@override_settings(ALLOWED_HOSTS=['127.0.0.1'])
+class LoadTestTest(SimpleTestCase):
+    def test_in_process(self):
+        paths = ('/demo/comments/?n=5', '/demo/table/')
+        results = loadtest.run(paths, threads=2, requests=4)
+        for path in paths:
+            self.assertEqual(results[path]['requests'], 4)
+            self.assertEqual(results[path]['errors'], 0)
+            self.assertGreater(results[path]['rps'], 0)
+            self.assertLessEqual(results[path]['p50'], results[path]['p99'])
+        self.assertEqual(results['all']['requests'], 8)
@@ -3,13 +3,16 @@ import unittest
 from importlib import import_module
 from django.template import Context, Template
 from datetime import datetime
+from decimal import Decimal
 
 # These are my modules that contain doctests:
 from best_templatetags.templatetags import best_filters
 
 DOCTEST_MODULES = (
     'best_templatetags.templatetags.best_filters',
+    'best_templatetags.templatetags.best_html',
     'best_templatetags.templatetags.best_tags',
+    'best_templatetags.saferegex',
 )
 
 
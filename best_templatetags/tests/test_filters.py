@@ -0,0 +1,25 @@
+import unittest
+
+from best_templatetags.templatetags.best_filters import batch
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class BatchTest(unittest.TestCase):
+    def test_arguments_checked_on_call(self):
+        # not only when the rows are iterated
+        self.assertRaises(ValueError, batch, [1, 2], 0)
+        self.assertRaises(ValueError, batch, [1, 2], 'x')
+
+    def test_empty(self):
+        self.assertEqual(list(batch('', 2)), [])
+        self.assertEqual(list(batch(None, 2)), [])
+
+    @unittest.skipIf(numpy is None, 'NumPy is not installed')
+    def test_ndarray(self):
+        rows = list(batch(numpy.arange(5), '2,0'))
+        self.assertEqual([list(row) for row in rows],
+                         [[0, 1], [2, 3], [4, '0']])
@@ -0,0 +1,39 @@
+import os
+import re
+import subprocess
+import sys
+import unittest
+
+# Budget for importing the best_filters library once Django is loaded,
+# in microseconds : it can be tuned with an environment variable
+IMPORT_BUDGET_US = int(os.environ.get('BEST_TEMPLATETAGS_IMPORT_BUDGET_US',
+                                      100000))
+
+IMPORT_SCRIPT = '''
+import django.template, django.conf, django.utils.translation
+import best_templatetags.templatetags.best_filters
+'''
+
+
+class ImportTimeTest(unittest.TestCase):
+    def importtime(self):
+        """Run 'python -X importtime' and give {module: cumulative us}"""
+        proc = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', IMPORT_SCRIPT],
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+            universal_newlines=True, check=True)
+        times = {}
+        for line in proc.stderr.splitlines():
+            m = re.match(r'import time:\s*(\d+)\s*\|\s*(\d+)\s*\|\s*(\S+)',
+                         line)
+            if m:
+                times[m.group(3)] = int(m.group(2))
+        return times
+
+    def test_bs4_not_imported(self):
+        self.assertNotIn('bs4', self.importtime())
+
+    def test_import_budget(self):
+        cumulative = self.importtime()[
+            'best_templatetags.templatetags.best_filters']
+        self.assertLessEqual(cumulative, IMPORT_BUDGET_US)
@@ -0,0 +1,61 @@
+import sys
+
+from django.contrib.auth.models import User
+from django.template import Context, Template
+from django.test import TestCase, override_settings
+from django.utils.functional import SimpleLazyObject
+
+from best_templatetags.templatetags.best_tags import describe_variable
+
+TEMPLATE = '{% load best_tags %}{% inspect_context %}'
+
+
+@override_settings(INSPECT_CONTEXT=True)
+class InspectContextTest(TestCase):
+    def setUp(self):
+        for name in ('ann', 'bob', 'cid'):
+            User.objects.create(username=name)
+
+    def test_querysets_are_not_evaluated(self):
+        users = User.objects.all()
+        evaluated = User.objects.all()
+        len(evaluated)
+        with self.assertNumQueries(0):
+            with self.assertLogs('best_templatetags.inspect_context', 'INFO'):
+                output = Template(TEMPLATE).render(Context(
+                    {'users': users, 'evaluated': evaluated}))
+        self.assertIsNone(users._result_cache)
+        self.assertIn('users : QuerySet, ', output)
+        self.assertIn(', not evaluated\n', output)
+        self.assertIn(', evaluated, 3 items', output)
+        # the evaluated QuerySet holds its users : it is the biggest
+        self.assertLess(output.index('evaluated :'), output.index('users :'))
+
+    def test_lazy_objects_are_not_evaluated(self):
+        def get_user():
+            raise AssertionError('lazy object evaluated')
+        evaluated = SimpleLazyObject(lambda: User.objects.get(username='ann'))
+        evaluated.username
+        with self.assertNumQueries(0):
+            with self.assertLogs('best_templatetags.inspect_context', 'INFO'):
+                output = Template(TEMPLATE).render(Context(
+                    {'user': SimpleLazyObject(get_user),
+                     'evaluated': evaluated}))
+        self.assertIn('user : SimpleLazyObject, ', output)
+        self.assertIn(' bytes, not evaluated', output)
+        self.assertIn('evaluated : User, ', output)
+        # the size is the one of the wrapped user
+        size = int(output.split('evaluated : User, ')[1].split()[0])
+        self.assertGreater(size, 500)
+
+    def test_dict_size(self):
+        values = {i: 'x' * (1000 + i) for i in range(100)}
+        holder = type('Holder', (), {})()
+        holder.__dict__.update({str(i): v for i, v in values.items()})
+        values_size = sum(sys.getsizeof(v) for v in values.values())
+        for value in (values, holder):
+            self.assertGreaterEqual(describe_variable(value)[1], values_size)
+
+    @override_settings(INSPECT_CONTEXT=False, DEBUG=False)
+    def test_disabled(self):
+        self.assertEqual(Template(TEMPLATE).render(Context({'a': 1})), '')
@@ -0,0 +1,72 @@
+import os
+import pickle
+import subprocess
+import sys
+
+from django import template
+from django.template import Context, Engine
+from django.test import SimpleTestCase, override_settings
+
+from best_templatetags import instrumentation, template_cache
+from best_templatetags.templatetags import best_filters, best_tags
+
+
+def make_library():
+    register = template.Library()
+    register.filters.update(best_filters.register.filters)
+    register.tags.update(best_tags.register.tags)
+    return register
+
+
+class InstrumentationTest(SimpleTestCase):
+    def setUp(self):
+        instrumentation.reset_stats()
+
+    def test_import_without_settings(self):
+        env = dict(os.environ)
+        env.pop('DJANGO_SETTINGS_MODULE', None)
+        subprocess.run(
+            [sys.executable, '-c',
+             'import best_templatetags.templatetags.best_filters, '
+             'best_templatetags.templatetags.best_html, '
+             'best_templatetags.templatetags.best_tags'],
+            env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+            check=True)
+
+    def test_disabled_wraps_nothing(self):
+        register = make_library()
+        instrumentation.instrument(register, 'lib')
+        self.assertIs(register.filters['listsort'],
+                      best_filters.register.filters['listsort'])
+        self.assertIs(register.tags['hash'], best_tags.register.tags['hash'])
+
+    @override_settings(BEST_TEMPLATETAGS_INSTRUMENT=True)
+    def test_enabled_records_stats(self):
+        register = make_library()
+        instrumentation.instrument(register, 'lib')
+        engine = Engine()
+        engine.template_libraries['lib'] = register
+        t = engine.from_string(
+            '{% load lib %}{{ lst|listsort|length }}{% hash "md5" "x" %}'
+            '{{ name|basename }}')
+        for _ in range(3):
+            t.render(Context({'lst': [3, 1, 2], 'name': '/a/b'}))
+        stats = instrumentation.get_stats()
+        self.assertEqual(stats['lib.listsort']['count'], 3)
+        self.assertEqual(stats['lib.listsort']['max_size'], 3)
+        self.assertEqual(stats['lib.hash']['count'], 3)
+        self.assertEqual(stats['lib.hash']['max_size'], 32)
+        self.assertEqual(stats['lib.basename']['count'], 3)
+        self.assertGreater(stats['lib.listsort']['p99'], 0)
+
+    @override_settings(BEST_TEMPLATETAGS_INSTRUMENT=True)
+    def test_instrumented_nodes_can_be_pickled(self):
+        register = make_library()
+        instrumentation.instrument(register, 'lib')
+        engine = Engine()
+        engine.template_libraries['lib'] = register
+        t = engine.from_string('{% load lib %}{% hash "md5" "x" %}')
+        t = pickle.loads(template_cache.dumps(t))
+        self.assertEqual(t.render(Context()),
+                         '9dd4e461268c8034f5c8564e155c67a6')
+        self.assertEqual(instrumentation.get_stats()['lib.hash']['count'], 1)
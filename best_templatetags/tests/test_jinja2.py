@@ -0,0 +1,103 @@
+import doctest
+import re
+import unittest
+from importlib import import_module
+
+from django.template import defaultfilters
+from django.utils.text import smart_split
+
+from best_templatetags.tests import test_doctests
+
+try:
+    from best_templatetags.jinja2 import PREFIX, environment
+except ImportError:  # Jinja2 is not installed
+    environment = None
+
+# doctests of tags that have no Jinja2 equivalent
+SKIPPED = ('best_templatetags.templatetags.best_tags.inspect_context',
+           'best_templatetags.templatetags.best_tags.minify',
+           'best_templatetags.templatetags.best_tags.profile')
+
+TAGS = ('update_url', 'extend_url', 'hash', 'render_template')
+
+# filters shadowing a Jinja2 builtin, registered with a prefix
+SHADOWED = ('batch', 'replace')
+
+STRING = r'"(?:[^"\\]|\\.)*"|\'(?:[^\'\\]|\\.)*\''
+FILTER_RE = re.compile(r'\|(\w+):(%s|[\w.]+)' % STRING)
+TAG_RE = re.compile(r'{%%\s*(%s)\s+(.*?)\s*%%}' % '|'.join(TAGS))
+
+
+def literal(arg):
+    # Jinja2 unescapes string literals, Django does not
+    if arg[:1] in '"\'':
+        return arg.replace('\\', '\\\\')
+    return arg
+
+
+def to_jinja2(source):
+    """Translate the Django syntax used in the doctests to Jinja2 syntax"""
+    source = re.sub(r'{%\s*load [\w ]+%}', '', source)
+    source = FILTER_RE.sub(
+        lambda m: '|%s(%s)' % (PREFIX + m.group(1) if m.group(1) in SHADOWED
+                               else m.group(1), literal(m.group(2))), source)
+
+    def tag(m):
+        args = []
+        for bit in smart_split(m.group(2)):
+            key, sep, value = bit.rpartition('=')
+            if key and not key[:1] in '"\'':
+                args.append('%s=%s' % (key, literal(value)))
+            else:
+                args.append(literal(bit))
+        return '{{ %s(%s) }}' % (m.group(1), ', '.join(args))
+    return TAG_RE.sub(tag, source)
+
+
+if environment is not None:
+    env = environment(autoescape=True)
+    # Django builtin filters used by the doctests
+    env.filters.update(floatformat=defaultfilters.floatformat,
+                       timesince=defaultfilters.timesince_filter)
+
+
+class Template(object):
+    def __init__(self, source):
+        self.template = env.from_string(to_jinja2(source))
+
+    def render(self, context):
+        return self.template.render(context)
+
+
+def Context(dict_):
+    return dict_
+
+
+class Finder(doctest.DocTestFinder):
+    def find(self, *args, **kwargs):
+        return [test for test in super().find(*args, **kwargs)
+                if test.name not in SKIPPED]
+
+
+@unittest.skipIf(environment is None, 'Jinja2 is not installed')
+class BuiltinFiltersTest(unittest.TestCase):
+    def test_not_shadowed(self):
+        render = lambda source: env.from_string(source).render(s='hello')
+        self.assertEqual(render('{{ s|replace("l", "L") }}'), 'heLLo')
+        self.assertEqual(render('{{ s|best_replace("/l/L/") }}'), 'heLLo')
+        self.assertEqual(render('{{ [1, 2, 3]|batch(2, 0)|list }}'),
+                         '[[1, 2], [3, 0]]')
+        self.assertEqual(render('{{ [1, 2, 3]|best_batch("2,-")|list }}'),
+                         '[[1, 2], [3, &#39;-&#39;]]')
+
+
+def load_tests(loader, tests, pattern):
+    suite = unittest.TestSuite()
+    suite.addTests(loader.loadTestsFromTestCase(BuiltinFiltersTest))
+    if environment is None:
+        return suite
+    globs = dict(vars(test_doctests), Template=Template, Context=Context)
+    for m in test_doctests.DOCTEST_MODULES:
+        suite.addTest(doctest.DocTestSuite(
+            import_module(m), globs=globs, test_finder=Finder()))
+    return suite
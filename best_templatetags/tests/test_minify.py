@@ -0,0 +1,34 @@
+import time
+
+from django.test import SimpleTestCase
+
+from best_templatetags.templatetags.best_tags import minify_html
+
+
+def duration(html):
+    start = time.perf_counter()
+    minify_html(html)
+    return time.perf_counter() - start
+
+
+class MinifyTest(SimpleTestCase):
+    def test_minify(self):
+        self.assertEqual(minify_html('a <!-- x -->\n b<!--y-->c'), 'a bc')
+        self.assertEqual(
+            minify_html('<PRE class="x">  a </pre >  <textarea> b\n'
+                        '</TEXTAREA><script>if (a  <b) {}</script>'),
+            '<PRE class="x">  a </pre > <textarea> b\n'
+            '</TEXTAREA><script>if (a  <b) {}</script>')
+        self.assertEqual(minify_html('<prefix>  a'), '<prefix> a')
+
+    def test_unclosed(self):
+        self.assertEqual(minify_html('a  b <!-- c  d'), 'a b <!-- c  d')
+        self.assertEqual(minify_html('a  b <pre> c  d'), 'a b <pre> c  d')
+
+    def test_linear_time(self):
+        for chunk in ('<!-- ', '<pre x ', '<pre>a</pre', '<!-- --', ' <a> '):
+            small = min(duration(chunk * 8000) for _ in range(3))
+            big = min(duration(chunk * 80000) for _ in range(3))
+            # a quadratic scan would be 100 times slower
+            self.assertLess(big, max(small, 1e-4) * 30, chunk)
+            self.assertLess(big, 1, chunk)
@@ -0,0 +1,62 @@
+from django.test import SimpleTestCase, override_settings
+
+from best_templatetags.saferegex import analyze
+from best_templatetags.templatetags.best_filters import resub, truncat
+
+SAFE = [
+    r'[a-z]+(?:-[a-z]+)*',
+    r'(\d{3})+',
+    r'(?:\w+\s)*x',
+    r'(?:[^,]+,)+$',
+    r'(?:ab*){2}',
+    r'/home/([^/]*)/projects',
+]
+
+UNSAFE = [
+    r'(a+)+$',
+    r'(a+){1,40}$',
+    r'(\w+\s?)*$',
+    r'(?:a*b*)+',
+    r'(.+,)+$',
+    r'(?:-[a-z-]+)*$',
+    # spaces between two commas can be split between two repetitions :
+    # 15 repetitions of ', ' followed by 'x' take seconds
+    r'(\s*,\s*)+$',
+]
+
+
+class AnalyzeTest(SimpleTestCase):
+    def test_safe(self):
+        for pattern in SAFE:
+            self.assertIsNone(analyze(pattern), pattern)
+
+    def test_unsafe(self):
+        for pattern in UNSAFE:
+            self.assertEqual(analyze(pattern), 'nested quantifiers', pattern)
+
+
+class RegexPolicyTest(SimpleTestCase):
+    def test_reject(self):
+        with override_settings(BEST_TEMPLATETAGS_REGEX_POLICY='reject'):
+            self.assertEqual(truncat('1 year, 2 months', ','), '1 year')
+            self.assertEqual(truncat('aaa!', '(a+)+$'), 'aaa!')
+            self.assertEqual(resub('/home/eric', r',/home/(\w+),\1'), 'eric')
+            self.assertEqual(resub('aaa!', '/(a+)+$/b'), 'aaa!')
+
+    def test_literal(self):
+        with override_settings(BEST_TEMPLATETAGS_REGEX_POLICY='literal'):
+            self.assertEqual(truncat('1 year, 2 months', ','), '1 year')
+            self.assertEqual(truncat('abc...xyz', '.'), 'abc')
+            self.assertEqual(truncat('a.b(a+)+c', '(a+)+'), 'a.b')
+            self.assertEqual(resub('/home/eric', r',/home/(\w+),\1'),
+                             '/home/eric')
+            self.assertEqual(resub(r'/home/(\w+)', r',/home/(\w+),\1'),
+                             r'\1')
+            self.assertEqual(resub('a.c abc', '/./-'), 'a-c abc')
+
+    def test_allow(self):
+        with override_settings(BEST_TEMPLATETAGS_REGEX_POLICY='allow'):
+            self.assertEqual(truncat('1 year, 2 months', ','), '1 year')
+            self.assertEqual(truncat('aaa!', '(a+)+'), '')
+            self.assertEqual(resub('/home/eric', r',/home/(\w+),\1'), 'eric')
+            self.assertEqual(resub('aaa!', '/(a+)+/b'), 'b!')
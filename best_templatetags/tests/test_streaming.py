@@ -0,0 +1,83 @@
+from django.contrib.auth.models import Group, User
+from django.template import Context, Engine
+from django.test import TestCase
+
+from best_templatetags.streaming import stream_template
+
+TEMPLATES = {
+    'base.html': '<h1>{% block title %}base{% endblock %}</h1>'
+                 '{% block content %}{% endblock %}',
+    'page.html': '{% extends "base.html" %}{% load best_tags %}'
+                 '{% block title %}{{ block.super }} page{% endblock %}'
+                 '{% block content %}'
+                 '{% for a, b in pairs %}{{ forloop.counter }}:{{ a }}{{ b }}'
+                 '{% if forloop.last %}.{% endif %} {% endfor %}'
+                 '{% for u in users reversed %}<{{ u.username }}>'
+                 '{% empty %}no user{% endfor %}'
+                 '{% render_template snippet %}{% endblock %}',
+}
+
+
+class StreamTemplateTest(TestCase):
+    def setUp(self):
+        self.engine = Engine(
+            loaders=[('django.template.loaders.locmem.Loader', TEMPLATES)],
+            libraries={'best_tags':
+                       'best_templatetags.templatetags.best_tags'})
+        self.template = self.engine.get_template('page.html')
+
+    def context(self, **kwargs):
+        c = {'pairs': [('a', 1), ('b', 2), ('c', 3)],
+             'snippet': '[{% for p in pairs %}{{ p.0 }}{% endfor %}]'}
+        c.update(kwargs)
+        return c
+
+    def test_same_output_as_render(self):
+        c = self.context(users=[])
+        self.assertEqual(
+            ''.join(stream_template(self.template, c)),
+            self.template.render(Context(c)))
+
+    def test_chunks(self):
+        c = self.context(users=[], pairs=[('x', i) for i in range(1000)])
+        chunks = list(stream_template(self.template, c, flush_size=100))
+        self.assertGreater(len(chunks), 10)
+        self.assertEqual(''.join(chunks), self.template.render(Context(c)))
+
+    def test_queryset_iterator(self):
+        for name in ('ann', 'bob', 'cid'):
+            User.objects.create(username=name)
+        users = User.objects.order_by('username')
+        with self.assertNumQueries(2):  # count() and iterator()
+            output = ''.join(stream_template(self.template,
+                                             self.context(users=users)))
+        self.assertIn('<cid><bob><ann>', output)
+        self.assertIsNone(users._result_cache)
+
+    def test_queryset_prefetch_related(self):
+        group = Group.objects.create(name='staff')
+        for name in ('ann', 'bob', 'cid'):
+            User.objects.create(username=name).groups.add(group)
+        template = self.engine.from_string(
+            '{% for u in users %}{{ u.username }}'
+            '{% for g in u.groups.all %}:{{ g.name }}{% endfor %} '
+            '{% endfor %}')
+        users = User.objects.order_by('username').prefetch_related('groups')
+        with self.assertNumQueries(2):  # users and their groups
+            output = ''.join(stream_template(template, {'users': users}))
+        self.assertEqual(output, 'ann:staff bob:staff cid:staff ')
+
+    def test_queryset_reversed_like_render(self):
+        for name in ('ann', 'bob', 'cid'):
+            User.objects.create(username=name)
+        template = self.engine.from_string(
+            '{% for u in users reversed %}{{ u.username }} {% endfor %}')
+        for label, users in (
+                ('unordered', User.objects.all()),
+                ('sliced', User.objects.order_by('username')[:2])):
+            with self.subTest(label):
+                expected = template.render(Context({'users': users.all()}))
+                self.assertEqual(
+                    ''.join(stream_template(template, {'users': users})),
+                    expected)
+
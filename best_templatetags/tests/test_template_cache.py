@@ -0,0 +1,60 @@
+import os
+import shutil
+import tempfile
+
+from django.core.management import call_command
+from django.template import Context, Template
+from django.test import SimpleTestCase, override_settings
+
+from best_templatetags import template_cache
+
+SOURCES = [
+    '{% load best_filters %}{{ mypath|basename|upper }} {{ s|replace:"/a/b" }}',
+    '{% if a and not b or c == 3 %}yes{% else %}no{% endif %}'
+    '{% for i in lst|dictsort:"x" %}{{ forloop.counter }}{{ i.x }}'
+    '{% empty %}-{% endfor %}',
+    '{% load best_tags %}{% update_url u f=4 %} {% hash "md5" s %}'
+    '{% render_template s %}',
+]
+
+
+class TemplateCacheTest(SimpleTestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.settings = override_settings(
+            RENDER_TEMPLATE_CACHE_DIR=self.cache_dir,
+            RENDER_TEMPLATE_PRECOMPILE=SOURCES)
+        self.settings.enable()
+        template_cache.templates.clear()
+
+    def tearDown(self):
+        self.settings.disable()
+        template_cache.templates.clear()
+        shutil.rmtree(self.cache_dir)
+
+    def test_precompile_and_load(self):
+        with open(os.devnull, 'w') as devnull:
+            call_command('precompile_render_templates', stdout=devnull)
+        context = {'mypath': '/x/y.txt', 's': '/a/c', 'a': 1, 'c': 3,
+                   'lst': [{'x': 2}, {'x': 1}], 'u': '?f=1'}
+        for source in SOURCES:
+            template = template_cache.load(source)
+            self.assertIsNotNone(template)
+            self.assertEqual(template.render(Context(context)),
+                             Template(source).render(Context(context)))
+
+    def test_stale_cache_is_compiled(self):
+        source = SOURCES[0]
+        path = template_cache.save(source)
+        with open(path, 'wb') as fh:
+            fh.write(b'stale')
+        with self.assertLogs('best_templatetags.template_cache', 'WARNING'):
+            self.assertIsNone(template_cache.load(source))
+            self.assertEqual(
+                template_cache.get_template(source).render(
+                    Context({'mypath': '/x/y.txt', 's': 'a'})), 'Y.TXT b')
+
+    def test_no_cache_dir(self):
+        with override_settings(RENDER_TEMPLATE_CACHE_DIR=None):
+            self.assertIsNone(template_cache.load(SOURCES[0]))
+            self.assertIsNone(template_cache.save(SOURCES[0]))
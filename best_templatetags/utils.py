@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+'''
+Helpers shared by the filters, the tags and the database expressions
+'''
+import datetime
+import time
+
+_today = (None, 0.0)
+
+
+def today():
+    """Give today's date, computed only once per day
+
+    The date is cached up to the next local midnight, so templates calling
+    the 'age' filter many times do not call datetime.date.today() each time.
+    """
+    global _today
+    day, expires = _today
+    if time.time() >= expires:
+        day = datetime.date.today()
+        midnight = datetime.datetime.combine(
+            day + datetime.timedelta(days=1), datetime.time.min)
+        _today = (day, midnight.timestamp())
+    return day
+
+
+def is_unevaluated_queryset(value):
+    """Tell whether value is a QuerySet that iterator() can read instead
+
+    That is a QuerySet whose result cache is still empty : reading it with
+    iterator() does not fill it. QuerySets using prefetch_related() are
+    excluded, iterator() ignores it before Django 4.1.
+    """
+    return (getattr(value, '_result_cache', False) is None
+            and hasattr(value, 'iterator')
+            and not getattr(value, '_prefetch_related_lookups', ()))
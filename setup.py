@@ -51,9 +51,9 @@ setup(name='django-best-templatetags',
           "License :: OSI Approved :: GNU Lesser General Public License v2 or later (LGPLv2+)",
           "Programming Language :: Python",
           "Programming Language :: Python :: 3",
-          "Programming Language :: Python :: 3.4",
-          "Programming Language :: Python :: 3.5",
-          "Programming Language :: Python :: 3.6",
+          "Programming Language :: Python :: 3.8",
+          "Programming Language :: Python :: 3.9",
+          "Programming Language :: Python :: 3.10",
       ],
       keywords='django',
       url='https://github.com/elapouya/django-best-templatetags',
@@ -61,7 +61,9 @@ setup(name='django-best-templatetags',
       author_email='elapouya@gmail.com',
       license='LGPL 2.1',
       packages=find_packages(),
+      python_requires='>=3.8',
       install_requires=['django>=1.8','beautifulsoup4'],
-      extras_require={'docs': ['Sphinx', 'sphinxcontrib-napoleon']},
+      extras_require={'docs': ['Sphinx', 'sphinxcontrib-napoleon'],
+                      'jinja2': ['Jinja2']},
       eager_resources=['docs'],
       zip_safe=False)